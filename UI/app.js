@@ -4,7 +4,8 @@
 
 // Configuration
 const API_BASE_URL = 'http://localhost:8000';
-const POLL_INTERVAL = 2000; // Poll every 2 seconds
+const POLL_INITIAL_DELAY = 100; // First status check after 100 ms...
+const POLL_MAX_DELAY = 5000; // ...doubling each time up to 5 seconds
 
 // State
 let activePolling = new Set();
@@ -304,6 +305,7 @@ async function pollJobStatus(jobId) {
     }
 
     activePolling.add(jobId);
+    let attempt = 0;
 
     const poll = async () => {
         try {
@@ -326,8 +328,11 @@ async function pollJobStatus(jobId) {
                 return;
             }
 
-            // Continue polling
-            setTimeout(poll, POLL_INTERVAL);
+            // Continue polling with exponential backoff - short jobs are
+            // picked up quickly, long ones aren't polled needlessly often
+            const delay = Math.min(POLL_MAX_DELAY, POLL_INITIAL_DELAY * 2 ** attempt);
+            attempt++;
+            setTimeout(poll, delay);
 
         } catch (error) {
             console.error('Polling error:', error);
@@ -331,8 +331,8 @@ function displayImages(images) {
 
     container.innerHTML = images.map(image => `
         <div class="image-item">
-            ${image.image_uri ? `
-                <img src="${image.image_uri}" alt="${image.caption || 'Image'}" />
+            ${image.image_url ? `
+                <img src="${API_BASE_URL}${image.image_url}" alt="${image.caption || 'Image'}" />
             ` : `
                 <div style="height: 200px; display: flex; align-items: center; justify-content: center; background: var(--bg-tertiary);">
                     <span class="text-muted">No image data</span>
@@ -2,21 +2,30 @@
 Configuration settings for Docling Parser API
 """
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import ClassVar, FrozenSet, List, Optional
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-# Try api/.env first, then root .env
-api_env_path = Path(__file__).parent / ".env"
-root_env_path = Path(__file__).parent.parent / ".env"
 
-if api_env_path.exists():
-    load_dotenv(api_env_path)
-elif root_env_path.exists():
-    load_dotenv(root_env_path)
-else:
-    load_dotenv()  # Try default search
+@lru_cache(maxsize=1)
+def _resolve_env_path() -> Optional[Path]:
+    """Find the .env file to load (api/.env first, then root .env)"""
+    api_env_path = Path(__file__).parent / ".env"
+    if api_env_path.exists():
+        return api_env_path
+
+    root_env_path = Path(__file__).parent.parent / ".env"
+    if root_env_path.exists():
+        return root_env_path
+
+    return None  # load_dotenv falls back to its default search
+
+
+# Load environment variables once and snapshot them so settings
+# lookups don't go back to os.environ
+load_dotenv(_resolve_env_path())
+_ENV = {**os.environ}
 
 class Settings:
     """API Configuration Settings"""
@@ -27,9 +36,9 @@ class Settings:
     API_DESCRIPTION: str = "REST API for parsing PDFs and documents using Docling"
 
     # Server Settings
-    HOST: str = os.getenv("API_HOST", "0.0.0.0")
-    PORT: int = int(os.getenv("API_PORT", "8000"))
-    RELOAD: bool = os.getenv("API_RELOAD", "True").lower() == "true"
+    HOST: str = _ENV.get("API_HOST", "0.0.0.0")
+    PORT: int = int(_ENV.get("API_PORT", "8000"))
+    RELOAD: bool = _ENV.get("API_RELOAD", "True").lower() == "true"
 
     # CORS Settings
     CORS_ORIGINS: List[str] = [
@@ -43,9 +52,12 @@ class Settings:
     ]
 
     # File Upload Settings
-    MAX_FILE_SIZE_MB: int = int(os.getenv("MAX_FILE_SIZE_MB", "50"))
+    MAX_FILE_SIZE_MB: int = int(_ENV.get("MAX_FILE_SIZE_MB", "50"))
     MAX_FILE_SIZE_BYTES: int = MAX_FILE_SIZE_MB * 1024 * 1024
+    UPLOAD_CHUNK_SIZE_BYTES: int = 1024 * 1024  # Uploads are streamed to disk in 1 MiB chunks
+    MAX_BATCH_FILES: int = int(_ENV.get("MAX_BATCH_FILES", "20"))  # Files accepted by one batch upload
     ALLOWED_EXTENSIONS: List[str] = [".pdf", ".docx", ".doc", ".html", ".md"]
+    ALLOWED_EXTENSIONS_SET: FrozenSet[str] = frozenset(ALLOWED_EXTENSIONS)  # O(1) membership checks
 
     # Supported MIME types
     SUPPORTED_MIME_TYPES: dict = {
@@ -63,32 +75,76 @@ class Settings:
     TEMP_DIR: Path = Path("api/temp")
     OUTPUT_DIR: Path = Path("api/output")
     RESULTS_TTL_SECONDS: int = 3600  # 1 hour
+    RESULTS_PERSIST_ENABLED: bool = _ENV.get("RESULTS_PERSIST_ENABLED", "True").lower() == "true"
+    RESULTS_DB_PATH: Path = Path("api/cache/results.sqlite3")  # Completed results, kept until they expire
+    RESULTS_MEMORY_MAX_ENTRIES: int = int(_ENV.get("RESULTS_MEMORY_MAX_ENTRIES", "32"))  # Persisted results also held in memory
+    RESULTS_CACHE_MAX_AGE_SECONDS: int = 300  # Client cache lifetime for completed results
 
     # Job Settings
     JOB_TIMEOUT_SECONDS: int = 300  # 5 minutes
-    MAX_CONCURRENT_JOBS: int = int(os.getenv("MAX_CONCURRENT_JOBS", "5"))
+    MAX_CONCURRENT_JOBS: int = int(_ENV.get("MAX_CONCURRENT_JOBS", "5"))  # Each running job holds its own copy of the Docling models
+    MAX_QUEUED_JOBS: int = int(_ENV.get("MAX_QUEUED_JOBS", "50"))  # Pending + processing jobs before uploads get 429
+    QUEUE_RETRY_AFTER_SECONDS: int = 5  # Retry-After sent with 429 responses
+    # Native threads per conversion (layout/table/OCR models). Up to MAX_CONCURRENT_JOBS
+    # conversions run at once, so the default splits the cores between them. Torch/OMP
+    # thread counts are process-wide, so the last configured value applies to all jobs.
+    PARSE_THREADS: int = int(_ENV.get(
+        "PARSE_THREADS", str(max(1, (os.cpu_count() or 4) // MAX_CONCURRENT_JOBS))
+    ))
 
     # Parsing Settings
     DEFAULT_PARSING_MODE: str = "standard"
     DEFAULT_IMAGE_SCALE: float = 2.0
     DEFAULT_EXTRACT_IMAGES: bool = True
     DEFAULT_EXTRACT_TABLES: bool = True
+    WARMUP_ON_STARTUP: bool = _ENV.get("WARMUP_ON_STARTUP", "True").lower() == "true"
+    WARMUP_PARSING_MODES: List[str] = [
+        mode.strip() for mode in _ENV.get("WARMUP_PARSING_MODES", DEFAULT_PARSING_MODE).split(",") if mode.strip()
+    ]
 
     # Image Description Settings
-    GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
-    OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    GEMINI_API_KEY: Optional[str] = _ENV.get("GEMINI_API_KEY")
+    OPENAI_API_KEY: Optional[str] = _ENV.get("OPENAI_API_KEY")
     DEFAULT_DESCRIPTION_PROMPT: str = "Describe this image in detail. Include what type of visual it is (chart, diagram, photo, etc.), main content, any text visible, and key insights."
-    GEMINI_MODEL: str = "gemini-2.0-flash-exp"  # Gemini model for image descriptions
+    GEMINI_MODEL: str = "gemini-2.5-flash"  # Gemini model for image descriptions
+    OPENAI_MODEL: str = "gpt-4o"  # OpenAI model for image descriptions
+    VLM_CONCURRENCY: int = int(_ENV.get("VLM_CONCURRENCY", "5"))  # Parallel description requests per job
+    VLM_MAX_CONCURRENT_REQUESTS: int = int(_ENV.get("VLM_MAX_CONCURRENT_REQUESTS", "16"))  # Description requests in flight across all jobs
+    VLM_BATCH_SIZE: int = int(_ENV.get("VLM_BATCH_SIZE", "1"))  # Images described per request (1 = one request per image)
+    VLM_IMAGE_MAX_EDGE: int = 1024  # Images are downscaled to this many pixels before description
+    VLM_IMAGE_JPEG_QUALITY: int = 85
+    SKIP_DECORATIVE_IMAGES: bool = True  # Don't describe logos, icons and other page furniture
+    MIN_IMAGE_SIZE: int = 50  # Minimum width/height (points) for an image to be described
+    MIN_IMAGE_AREA: int = 4096  # Minimum area (points^2) for an image to be described
+    DESCRIPTION_CACHE_ENABLED: bool = _ENV.get("DESCRIPTION_CACHE_ENABLED", "True").lower() == "true"
+    DESCRIPTION_CACHE_PATH: Path = Path("api/cache/descriptions.sqlite3")  # Reused across re-parses of the same images
 
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_REQUESTS: int = 100  # requests per minute
 
+    # Set once the storage directories exist so later instances skip the syscalls
+    _dirs_created: ClassVar[bool] = False
+
     def __init__(self):
-        """Create necessary directories on initialization"""
-        self.TEMP_DIR.mkdir(parents=True, exist_ok=True)
-        self.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        """Create necessary directories on first initialization"""
+        if not Settings._dirs_created:
+            os.makedirs(self.TEMP_DIR, exist_ok=True)
+            os.makedirs(self.OUTPUT_DIR, exist_ok=True)
+            Settings._dirs_created = True
+
+    @staticmethod
+    def reload() -> "Settings":
+        """Drop the cached settings instance and build a fresh one (for tests)"""
+        get_settings.cache_clear()
+        return get_settings()
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the shared settings instance"""
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
@@ -2,22 +2,31 @@
 Docling Document Parser REST API
 FastAPI application with complete document parsing endpoints
 """
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Query
+from fastapi import (
+    FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Query, Header, Depends,
+    Request, WebSocket, WebSocketDisconnect
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
-from typing import Optional
-import json
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, RedirectResponse, Response, FileResponse
+from typing import List, Optional
+from pathlib import Path
+from contextlib import aclosing
+import asyncio
+import hashlib
 
 from config import settings
 from models import (
     ParsingMode, JobStatus, ParseOptions,
-    JobCreatedResponse, JobStatusResponse, ParseResultResponse,
+    JobCreatedResponse, BatchJobsCreatedResponse, JobStatusResponse, ParseResultResponse,
     TextsResponse, TablesResponse, ImagesResponse,
     ErrorResponse, ExportFormat, ImageDescriptionProvider
 )
-from storage import job_storage
-from utils import validate_file, save_upload_file, generate_job_id
-from parser import parse_document_task
+from storage import Job, job_storage, public_job, result_json, texts_json, tables_json, images_json
+from utils import (
+    validate_file, save_upload_file, generate_job_id, job_image_path, cleanup_job_files
+)
+from parser import parse_document_task, warmup
 
 
 # ============================================================================
@@ -29,7 +38,8 @@ app = FastAPI(
     version=settings.API_VERSION,
     description=settings.API_DESCRIPTION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS Middleware
@@ -41,6 +51,197 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON/markdown payloads - Brotli when installed (falls back to
+# gzip for clients that don't accept br), plain gzip otherwise
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=1024, quality=4, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+
+# Top-level keys of a result that can be requested with ?fields=
+RESULT_FIELDS = frozenset(ParseResultResponse.model_fields)
+
+# Bounds how many documents are parsed at once; extra jobs wait as PENDING
+job_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_JOBS)
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+async def run_parse_job(job_id: str, file_path: Path,
+                        parsing_mode: ParsingMode, options: dict):
+    """Run a parsing job in a worker thread once a job slot is free"""
+    async with job_semaphore:
+        await asyncio.to_thread(
+            parse_document_task, job_id, file_path, parsing_mode, options
+        )
+
+
+def check_queue_capacity(new_jobs: int = 1):
+    """Reject uploads with 429 while the parse backlog is full"""
+    if job_storage.count_active_jobs() + new_jobs > settings.MAX_QUEUED_JOBS:
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "error": "QUEUE_FULL",
+                "message": "Too many documents are waiting to be parsed. Retry later."
+            },
+            headers={"Retry-After": str(settings.QUEUE_RETRY_AFTER_SECONDS)}
+        )
+
+
+def content_key(file_hash: str, parsing_mode: ParsingMode, options: dict) -> str:
+    """Identify a parse by file contents and everything that affects its output"""
+    return hashlib.sha256(
+        f"{file_hash}:{parsing_mode.value}:{sorted(options.items())!r}".encode("utf-8")
+    ).hexdigest()
+
+
+def queue_parse_job(background_tasks: BackgroundTasks, job_id: str, filename: str,
+                    file_path: Path, file_hash: str, parsing_mode: ParsingMode,
+                    options: dict) -> JobCreatedResponse:
+    """
+    Create the job record for a saved upload and queue its parsing task
+
+    An identical upload (same contents, mode and options) whose job is still
+    running or has live results is answered with that job instead, and the
+    new copy of the file is discarded.
+    """
+    key = content_key(file_hash, parsing_mode, options)
+
+    existing = job_storage.find_job_by_content(key)
+    if existing is not None:
+        background_tasks.add_task(cleanup_job_files, job_id)
+        return JobCreatedResponse(
+            job_id=existing.job_id,
+            status=existing.status,
+            status_url=f"/api/v1/parse/jobs/{existing.job_id}",
+            estimated_time_seconds=0 if existing.status == JobStatus.COMPLETED else 30,
+            cached=True
+        )
+
+    job_storage.create_job(
+        job_id=job_id,
+        filename=filename,
+        file_path=str(file_path),
+        parsing_mode=parsing_mode.value,
+        options=options,
+        content_key=key
+    )
+
+    background_tasks.add_task(
+        run_parse_job,
+        job_id=job_id,
+        file_path=file_path,
+        parsing_mode=parsing_mode,
+        options=options
+    )
+
+    return JobCreatedResponse(
+        job_id=job_id,
+        status=JobStatus.PENDING,
+        status_url=f"/api/v1/parse/jobs/{job_id}",
+        estimated_time_seconds=30
+    )
+
+
+def job_status_response(job: Job) -> JobStatusResponse:
+    """Build the status response for a job record"""
+    return JobStatusResponse(
+        job_id=job.job_id,
+        status=job.status,
+        progress_percent=job.progress_percent,
+        result_url=f"/api/v1/parse/results/{job.job_id}" if job.status == JobStatus.COMPLETED else None,
+        error_message=job.error_message,
+        created_at=job.created_at,
+        completed_at=job.completed_at
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def job_status_etag(job: Job) -> str:
+    """ETag identifying a job's current status and progress"""
+    return f'"{job.status.value}-{job.progress_percent}-{job.updated_at.timestamp()}"'
+
+
+async def wait_for_job_change(job_id: str, if_none_match: Optional[str],
+                              timeout: float) -> Optional[Job]:
+    """
+    Wait until a job's status ETag no longer matches If-None-Match
+
+    Returns the latest job state once it changes, the job finishes, or
+    `timeout` seconds pass (None if the job doesn't exist).
+    """
+    job = None
+    try:
+        async with asyncio.timeout(timeout):
+            async with aclosing(job_storage.subscribe(job_id)) as updates:
+                async for job in updates:
+                    if not etag_matches(if_none_match, job_status_etag(job)):
+                        break
+    except TimeoutError:
+        pass
+    return job
+
+
+def cache_headers(etag: str) -> dict:
+    """Caching headers for results of a completed job"""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.RESULTS_CACHE_MAX_AGE_SECONDS}"
+    }
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated ?fields= selection (None if nothing is selected)"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()] or None
+
+
+def result_etag(result: dict, selected: Optional[List[str]] = None) -> str:
+    """ETag of a result, distinct per field selection so caches don't mix representations"""
+    if not selected:
+        return result["_etag"]
+    return f'{result["_etag"][:-1]}-{"+".join(selected)}"'
+
+
+def check_not_modified(job_id: str, if_none_match: Optional[str],
+                       selected: Optional[List[str]] = None):
+    """Raise 304 Not Modified if the client already holds the current result"""
+    if not if_none_match:
+        return
+
+    result = job_storage.get_result(job_id)
+    if result:
+        etag = result_etag(result, selected)
+        if etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=cache_headers(etag))
+
+
+def etag_guard(job_id: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Dependency that short-circuits with 304 Not Modified when the client
+    already holds the current version of a job's results
+    """
+    check_not_modified(job_id, if_none_match)
+
+
+def results_etag_guard(job_id: str, request: Request, if_none_match: Optional[str] = Header(None)):
+    """etag_guard for the full results endpoint, which has an ETag per ?fields= selection"""
+    check_not_modified(job_id, if_none_match, parse_fields(request.query_params.get("fields")))
+
 
 # ============================================================================
 # ENDPOINTS - Root
@@ -89,7 +290,7 @@ async def parse_document(
         default=2.0,
         ge=1.0,
         le=4.0,
-        description="Image quality scale (1.0-4.0)"
+        description="Image quality scale (1.0-4.0, rounded to 0.5 steps)"
     ),
     describe_images: bool = Query(
         default=False,
@@ -119,11 +320,14 @@ async def parse_document(
     # Validate file
     content_type = validate_file(file)
 
+    # Back-pressure: don't accept work the parse queue can't absorb
+    check_queue_capacity()
+
     # Generate job ID
     job_id = generate_job_id()
 
     # Save uploaded file
-    file_path = await save_upload_file(file, job_id)
+    file_path, file_hash = await save_upload_file(file, job_id)
 
     # Prepare parsing options
     options = {
@@ -135,30 +339,100 @@ async def parse_document(
         "description_prompt": description_prompt
     }
 
-    # Create job record
-    job_storage.create_job(
-        job_id=job_id,
-        filename=file.filename,
-        file_path=str(file_path),
-        parsing_mode=parsing_mode.value,
-        options=options
+    # Create job record and queue background parsing task
+    return queue_parse_job(
+        background_tasks, job_id, file.filename, file_path, file_hash, parsing_mode, options
     )
 
-    # Queue background parsing task
-    background_tasks.add_task(
-        parse_document_task,
-        job_id=job_id,
-        file_path=file_path,
-        parsing_mode=parsing_mode,
-        options=options
-    )
 
-    return JobCreatedResponse(
-        job_id=job_id,
-        status=JobStatus.PENDING,
-        status_url=f"/api/v1/parse/jobs/{job_id}",
-        estimated_time_seconds=30
+@app.post(
+    "/api/v1/parse/documents",
+    response_model=BatchJobsCreatedResponse,
+    status_code=202,
+    tags=["Document Parsing"],
+    summary="Upload and parse several documents",
+    description="Upload several documents in one request. Every file is parsed with the same options and gets its own job ID."
+)
+async def parse_documents(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(..., description="Document files to parse"),
+    parsing_mode: ParsingMode = Query(
+        default=ParsingMode.STANDARD,
+        description="Parsing mode: standard, ocr, fast, or high_quality"
+    ),
+    extract_images: bool = Query(
+        default=True,
+        description="Extract images from documents"
+    ),
+    extract_tables: bool = Query(
+        default=True,
+        description="Extract tables from documents"
+    ),
+    images_scale: float = Query(
+        default=2.0,
+        ge=1.0,
+        le=4.0,
+        description="Image quality scale (1.0-4.0, rounded to 0.5 steps)"
+    ),
+    describe_images: bool = Query(
+        default=False,
+        description="Generate AI descriptions for images"
+    ),
+    description_provider: ImageDescriptionProvider = Query(
+        default=ImageDescriptionProvider.NONE,
+        description="Provider for image descriptions: none, docling (SmolVLM), gemini, or openai"
+    ),
+    description_prompt: Optional[str] = Query(
+        default=None,
+        description="Custom prompt for image descriptions (optional)"
     )
+):
+    """
+    Upload a batch of documents for parsing.
+
+    Saves one round-trip per document compared to calling
+    /api/v1/parse/document for each file. The batch is all-or-nothing: if
+    any file is rejected, no jobs are created.
+
+    Returns one job per file, in upload order.
+    """
+    if len(files) > settings.MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Maximum per batch: {settings.MAX_BATCH_FILES}"
+        )
+
+    # Validate every file before writing anything to disk
+    for file in files:
+        validate_file(file)
+
+    check_queue_capacity(len(files))
+
+    options = {
+        "extract_images": extract_images,
+        "extract_tables": extract_tables,
+        "images_scale": images_scale,
+        "describe_images": describe_images,
+        "description_provider": description_provider,
+        "description_prompt": description_prompt
+    }
+
+    # Save all uploads first so a rejected file doesn't leave earlier jobs
+    # stuck in PENDING (background tasks only run if the request succeeds)
+    saved = []
+    try:
+        for file in files:
+            job_id = generate_job_id()
+            saved.append((job_id, file.filename, *await save_upload_file(file, job_id)))
+    except HTTPException:
+        for job_id, *_ in saved:
+            await asyncio.to_thread(cleanup_job_files, job_id)
+        raise
+
+    return BatchJobsCreatedResponse(jobs=[
+        queue_parse_job(background_tasks, job_id, filename, file_path, file_hash, parsing_mode, options)
+        for job_id, filename, file_path, file_hash in saved
+    ])
 
 
 # ============================================================================
@@ -172,7 +446,10 @@ async def parse_document(
     summary="Check job status",
     description="Check the processing status of a parsing job"
 )
-async def get_job_status(job_id: str):
+async def get_job_status(job_id: str, response: Response,
+                         if_none_match: Optional[str] = Header(None),
+                         wait: bool = Query(False, description="Long-poll: hold the request until the status differs from If-None-Match"),
+                         timeout: float = Query(30.0, ge=0, le=60, description="Maximum seconds to hold a long-poll request")):
     """
     Check the status of a parsing job.
 
@@ -182,7 +459,10 @@ async def get_job_status(job_id: str):
     - Result URL (if completed)
     - Error message (if failed)
     """
-    job = job_storage.get_job(job_id)
+    if wait:
+        job = await wait_for_job_change(job_id, if_none_match, timeout)
+    else:
+        job = await job_storage.get_job_async(job_id)
 
     if not job:
         raise HTTPException(
@@ -193,15 +473,39 @@ async def get_job_status(job_id: str):
             }
         )
 
-    return JobStatusResponse(
-        job_id=job["job_id"],
-        status=job["status"],
-        progress_percent=job.get("progress_percent"),
-        result_url=f"/api/v1/parse/results/{job_id}" if job["status"] == JobStatus.COMPLETED else None,
-        error_message=job.get("error_message"),
-        created_at=job["created_at"],
-        completed_at=job.get("completed_at")
-    )
+    # Pollers send the last ETag back and get an empty 304 while nothing changed
+    etag = job_status_etag(job)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return job_status_response(job)
+
+
+@app.websocket("/api/v1/parse/jobs/{job_id}/ws")
+async def job_status_ws(websocket: WebSocket, job_id: str):
+    """
+    Push job status updates instead of polling.
+
+    Sends the current status on connect, then one message per status or
+    progress change, and closes once the job has completed or failed.
+    """
+    await websocket.accept()
+
+    sent_any = False
+    try:
+        async with aclosing(job_storage.subscribe(job_id)) as updates:
+            async for job in updates:
+                await websocket.send_text(job_status_response(job).model_dump_json())
+                sent_any = True
+    except WebSocketDisconnect:
+        return
+
+    if sent_any:
+        await websocket.close()
+    else:
+        await websocket.close(code=1008, reason=f"Job with ID '{job_id}' not found")
 
 
 # ============================================================================
@@ -210,12 +514,19 @@ async def get_job_status(job_id: str):
 
 @app.get(
     "/api/v1/parse/results/{job_id}",
-    response_model=ParseResultResponse,
+    dependencies=[Depends(results_etag_guard)],
+    responses={200: {"model": ParseResultResponse}},
     tags=["Results"],
     summary="Get complete parsing results",
     description="Retrieve complete parsing results including metadata, texts, tables, and images"
 )
-async def get_results(job_id: str):
+async def get_results(
+    job_id: str,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated top-level fields to return (e.g. 'metadata,statistics')"
+    )
+):
     """
     Get complete parsing results for a job.
 
@@ -226,12 +537,26 @@ async def get_results(job_id: str):
     - Text items with labels and positions
     - Tables with data
     - Images with captions
+
+    Use `fields` to fetch only part of the result without downloading the content.
     """
-    result = job_storage.get_result(job_id)
+    selected = parse_fields(fields)
+    if selected:
+        unknown = set(selected) - RESULT_FIELDS
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "error": "INVALID_FIELDS",
+                    "message": f"Unknown result fields: {', '.join(sorted(unknown))}",
+                    "valid_fields": sorted(RESULT_FIELDS)
+                }
+            )
+
+    job, result = await job_storage.get_job_and_result_async(job_id)
 
     if not result:
         # Check if job exists
-        job = job_storage.get_job(job_id)
         if not job:
             raise HTTPException(
                 status_code=404,
@@ -242,15 +567,15 @@ async def get_results(job_id: str):
             )
 
         # Job exists but result not ready or expired
-        if job["status"] == JobStatus.FAILED:
+        if job.status == JobStatus.FAILED:
             raise HTTPException(
                 status_code=500,
                 detail={
                     "error": "PARSING_FAILED",
-                    "message": job.get("error_message", "Document parsing failed")
+                    "message": job.error_message or "Document parsing failed"
                 }
             )
-        elif job["status"] in [JobStatus.PENDING, JobStatus.PROCESSING]:
+        elif job.status in [JobStatus.PENDING, JobStatus.PROCESSING]:
             raise HTTPException(
                 status_code=202,
                 detail={
@@ -268,7 +593,20 @@ async def get_results(job_id: str):
                 }
             )
 
-    return ParseResultResponse(**result)
+    if selected:
+        return Response(
+            content=result_json(result, selected),
+            media_type="application/json",
+            headers=cache_headers(result_etag(result, selected))
+        )
+
+    # Server-built result: skip re-validating it through ParseResultResponse
+    # and send the JSON encoded at store time
+    return Response(
+        content=result_json(result),
+        media_type="application/json",
+        headers=cache_headers(result["_etag"])
+    )
 
 
 # ============================================================================
@@ -277,6 +615,7 @@ async def get_results(job_id: str):
 
 @app.get(
     "/api/v1/parse/results/{job_id}/texts",
+    dependencies=[Depends(etag_guard)],
     response_model=TextsResponse,
     tags=["Results"],
     summary="Get text items",
@@ -294,29 +633,22 @@ async def get_texts(
     - page: Page number
     - label: Text label (title, paragraph, section_header, etc.)
     """
-    result = job_storage.get_result(job_id)
+    result = await job_storage.get_result_async(job_id)
     if not result:
         raise HTTPException(status_code=404, detail="Results not found")
 
-    texts = result["content"]["texts"]
-
-    # Apply filters
-    if page is not None:
-        texts = [t for t in texts if t.get("page") == page]
-
-    if label is not None:
-        texts = [t for t in texts if t.get("label") == label]
-
-    return TextsResponse(
-        texts=texts,
-        count=len(texts),
-        page_filter=page,
-        label_filter=label
+    # Served from the items encoded at store time - nothing is decoded or
+    # re-validated per request
+    return Response(
+        content=texts_json(result, page, label),
+        media_type="application/json",
+        headers=cache_headers(result["_etag"])
     )
 
 
 @app.get(
     "/api/v1/parse/results/{job_id}/tables",
+    dependencies=[Depends(etag_guard)],
     response_model=TablesResponse,
     tags=["Results"],
     summary="Get tables",
@@ -336,33 +668,21 @@ async def get_tables(
     - dict: Table data as nested dictionary
     - csv: Table data as CSV string
     """
-    result = job_storage.get_result(job_id)
+    result = await job_storage.get_result_async(job_id)
     if not result:
         raise HTTPException(status_code=404, detail="Results not found")
 
-    tables = result["content"]["tables"]
-
-    # Format tables based on requested format
-    if format == ExportFormat.CSV:
-        # Return only CSV data
-        formatted_tables = []
-        for table in tables:
-            formatted_tables.append({
-                "id": table["id"],
-                "page": table.get("page"),
-                "csv": table.get("dataframe_csv", "")
-            })
-        tables = formatted_tables
-
-    return TablesResponse(
-        tables=tables,
-        count=len(tables),
-        format=format.value
+    # Both formats are encoded at store time
+    return Response(
+        content=tables_json(result, csv=format == ExportFormat.CSV),
+        media_type="application/json",
+        headers=cache_headers(result["_etag"])
     )
 
 
 @app.get(
     "/api/v1/parse/results/{job_id}/images",
+    dependencies=[Depends(etag_guard)],
     response_model=ImagesResponse,
     tags=["Results"],
     summary="Get images",
@@ -376,17 +696,45 @@ async def get_images(job_id: str):
     - Image ID and page number
     - Bounding box coordinates
     - Caption (if available)
-    - Image data as base64 URI
+    - Image URL (fetch the PNG from the image endpoint)
     """
-    result = job_storage.get_result(job_id)
+    result = await job_storage.get_result_async(job_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Results not found")
+
+    return Response(
+        content=images_json(result),
+        media_type="application/json",
+        headers=cache_headers(result["_etag"])
+    )
+
+
+@app.get(
+    "/api/v1/parse/results/{job_id}/image/{image_index}",
+    dependencies=[Depends(etag_guard)],
+    response_class=FileResponse,
+    tags=["Results"],
+    summary="Get image file",
+    description="Download a single extracted image as PNG"
+)
+async def get_image_file(job_id: str, image_index: int):
+    """
+    Get an extracted image by its position in the images list.
+
+    The `image_url` of each picture points here.
+    """
+    result = await job_storage.get_result_async(job_id)
     if not result:
         raise HTTPException(status_code=404, detail="Results not found")
 
-    pictures = result["content"]["pictures"]
+    image_path = job_image_path(job_id, image_index)
+    if image_index < 0 or not image_path.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
 
-    return ImagesResponse(
-        images=pictures,
-        count=len(pictures)
+    return FileResponse(
+        image_path,
+        media_type="image/png",
+        headers=cache_headers(result["_etag"])
     )
 
 
@@ -396,6 +744,7 @@ async def get_images(job_id: str):
 
 @app.get(
     "/api/v1/parse/results/{job_id}/export/markdown",
+    dependencies=[Depends(etag_guard)],
     response_class=PlainTextResponse,
     tags=["Export"],
     summary="Export as Markdown",
@@ -407,15 +756,20 @@ async def export_markdown(job_id: str):
 
     Returns plain text markdown representation of the document.
     """
-    result = job_storage.get_result(job_id)
+    result = await job_storage.get_result_async(job_id)
     if not result:
         raise HTTPException(status_code=404, detail="Results not found")
 
-    return result["content"]["markdown"]
+    return Response(
+        content=result["_markdown_bytes"],
+        media_type="text/markdown; charset=utf-8",
+        headers=cache_headers(result["_etag"])
+    )
 
 
 @app.get(
     "/api/v1/parse/results/{job_id}/export/json",
+    dependencies=[Depends(etag_guard)],
     tags=["Export"],
     summary="Export as JSON",
     description="Get complete document data as JSON"
@@ -426,11 +780,15 @@ async def export_json(job_id: str):
 
     Includes all metadata, statistics, texts, tables, and images.
     """
-    result = job_storage.get_result(job_id)
+    result = await job_storage.get_result_async(job_id)
     if not result:
         raise HTTPException(status_code=404, detail="Results not found")
 
-    return JSONResponse(content=result)
+    return Response(
+        content=result_json(result),
+        media_type="application/json",
+        headers=cache_headers(result["_etag"])
+    )
 
 
 # ============================================================================
@@ -499,7 +857,7 @@ async def list_jobs(
     jobs = job_storage.get_all_jobs(status=status)
 
     return {
-        "jobs": jobs,
+        "jobs": [public_job(job) for job in jobs],
         "count": len(jobs),
         "status_filter": status.value if status else None
     }
@@ -513,6 +871,11 @@ async def list_jobs(
 async def startup_event():
     """Initialize application on startup"""
     print(f"Starting {settings.API_TITLE} v{settings.API_VERSION}")
+
+    if settings.WARMUP_ON_STARTUP:
+        print("Loading Docling models...")
+        await asyncio.to_thread(warmup)
+
     print(f"Docs available at: http://{settings.HOST}:{settings.PORT}/docs")
 
 
@@ -520,6 +883,7 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     print("Shutting down API...")
+    job_storage.shutdown()
 
 
 # ============================================================================
@@ -529,9 +893,24 @@ async def shutdown_event():
 if __name__ == "__main__":
     import uvicorn
 
+    # uvloop/httptools ship with uvicorn[standard] but uvloop has no Windows build
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+
     uvicorn.run(
         "main:app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=settings.RELOAD
+        reload=settings.RELOAD,
+        loop=loop,
+        http=http
     )
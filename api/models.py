@@ -4,7 +4,7 @@ Pydantic models for API request/response schemas
 from datetime import datetime
 from enum import Enum
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # ============================================================================
@@ -76,6 +76,12 @@ class JobCreatedResponse(BaseModel):
     status: JobStatus = Field(..., description="Current job status")
     status_url: str = Field(..., description="URL to check job status")
     estimated_time_seconds: Optional[int] = Field(None, description="Estimated processing time")
+    cached: bool = Field(False, description="Job reused from an identical earlier upload (same file and options)")
+
+
+class BatchJobsCreatedResponse(BaseModel):
+    """Response when a batch of parsing jobs is created"""
+    jobs: List[JobCreatedResponse] = Field(..., description="One job per uploaded file, in upload order")
 
 
 class JobStatusResponse(BaseModel):
@@ -92,9 +98,13 @@ class JobStatusResponse(BaseModel):
 # ============================================================================
 # RESPONSE MODELS - Document Content
 # ============================================================================
+# Items are built server-side with model_construct() (see utils.py), which
+# skips validation; extra="forbid" still guards any validated construction.
 
 class BoundingBox(BaseModel):
     """Bounding box coordinates"""
+    model_config = ConfigDict(extra="forbid")
+
     left: float
     top: float
     right: float
@@ -103,6 +113,8 @@ class BoundingBox(BaseModel):
 
 class TextItem(BaseModel):
     """Extracted text item with metadata"""
+    model_config = ConfigDict(extra="forbid")
+
     label: str = Field(..., description="Text type (title, paragraph, section_header, etc.)")
     text: str = Field(..., description="Extracted text content")
     page: Optional[int] = Field(None, description="Page number")
@@ -111,6 +123,8 @@ class TextItem(BaseModel):
 
 class TableItem(BaseModel):
     """Extracted table with data"""
+    model_config = ConfigDict(extra="forbid")
+
     id: str = Field(..., description="Table reference ID")
     page: Optional[int] = Field(None, description="Page number")
     rows: Optional[int] = Field(None, description="Number of rows")
@@ -121,17 +135,22 @@ class TableItem(BaseModel):
 
 class PictureItem(BaseModel):
     """Extracted picture/image with metadata"""
+    model_config = ConfigDict(extra="forbid")
+
     id: str = Field(..., description="Picture reference ID")
     page: Optional[int] = Field(None, description="Page number")
     bbox: Optional[BoundingBox] = Field(None, description="Bounding box coordinates")
     caption: Optional[str] = Field(None, description="Image caption")
-    image_uri: Optional[str] = Field(None, description="Image data URI (base64)")
+    image_url: Optional[str] = Field(None, description="URL of the image file (PNG)")
     description: Optional[str] = Field(None, description="AI-generated image description")
     description_provider: Optional[str] = Field(None, description="Provider used for description")
+    description_skipped: Optional[str] = Field(None, description="Why no description was generated (e.g. 'decorative')")
 
 
 class PageInfo(BaseModel):
     """Page metadata"""
+    model_config = ConfigDict(extra="forbid")
+
     page_number: int
     width: Optional[float] = None
     height: Optional[float] = None
@@ -180,6 +199,10 @@ class ParseResultResponse(BaseModel):
     metadata: DocumentMetadata
     statistics: DocumentStatistics
     content: DocumentContent
+    enrichment_failures: List[str] = Field(
+        default_factory=list,
+        description="IDs of pictures whose AI description failed after retries"
+    )
     exports: ExportUrls
 
 
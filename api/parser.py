@@ -2,28 +2,39 @@
 Docling document parser implementation
 Handles document conversion and data extraction
 """
+import gc
 import os
 import time
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from threading import Lock
+from typing import Dict, Any, Iterator, List, Tuple
 
 # Disable symlinks for Windows compatibility
 os.environ["HF_HUB_DISABLE_SYMLINKS"] = "1"
 
 from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.datamodel.base_models import InputFormat
+from docling.datamodel.base_models import DocumentStream, InputFormat
+from docling.datamodel.accelerator_options import AcceleratorOptions
 from docling.datamodel.pipeline_options import PdfPipelineOptions
 
 from models import (
-    ParsingMode, JobStatus, DocumentContent,
+    ParsingMode, JobStatus,
     ParseResultResponse, DocumentMetadata, ImageDescriptionProvider
 )
 from utils import (
     extract_metadata, extract_statistics, extract_pages,
     extract_texts, extract_tables, extract_pictures, cleanup_job_files,
-    describe_image_with_gemini, describe_image_with_openai
+    cleanup_job_output, job_image_path, vlm_image_data_uri,
+    describe_image_with_gemini, describe_image_with_openai,
+    describe_images_with_gemini, describe_images_with_openai
 )
-from storage import job_storage
+from storage import job_storage, description_cache
 from config import settings
 
 
@@ -49,6 +60,13 @@ class DocumentParser:
         """
         pipeline_options = PdfPipelineOptions()
 
+        # Model inference runs in native code outside the GIL; each of the
+        # concurrent jobs gets its share of the cores (see PARSE_THREADS)
+        pipeline_options.accelerator_options = AcceleratorOptions(num_threads=settings.PARSE_THREADS)
+
+        # Table structure recognition is only needed when tables are extracted
+        pipeline_options.do_table_structure = options.get("extract_tables", settings.DEFAULT_EXTRACT_TABLES)
+
         # Image extraction settings
         if options.get("extract_images", settings.DEFAULT_EXTRACT_IMAGES):
             pipeline_options.generate_picture_images = True
@@ -67,9 +85,11 @@ class DocumentParser:
                 from docling.datamodel.pipeline_options import smolvlm_picture_description
                 pipeline_options.picture_description_options = smolvlm_picture_description
 
-                # Set custom prompt if provided
+                # Set custom prompt if provided (on a copy - the preset is shared)
                 if options.get("description_prompt"):
-                    pipeline_options.picture_description_options.prompt = options["description_prompt"]
+                    pipeline_options.picture_description_options = smolvlm_picture_description.model_copy(
+                        update={"prompt": options["description_prompt"]}
+                    )
 
         # Mode-specific configurations
         if parsing_mode == ParsingMode.OCR:
@@ -86,31 +106,33 @@ class DocumentParser:
             # High quality mode - maximum accuracy
             pipeline_options.generate_picture_images = True
             pipeline_options.images_scale = 3.0
-            pipeline_options.do_table_structure = True
 
         # Standard mode uses defaults
 
         return pipeline_options
 
-    def _enrich_images_with_descriptions(self, pictures: list, options: Dict[str, Any]) -> list:
+    def _enrich_images_with_descriptions(self, job_id: str, pictures: list,
+                                         options: Dict[str, Any]) -> Tuple[list, List[str]]:
         """
         Add AI-generated descriptions to images using external providers
 
         Args:
+            job_id: Job identifier (images are read from its output directory)
             pictures: List of PictureItem dictionaries
             options: Parsing options with description settings
 
         Returns:
-            List of PictureItem dictionaries with descriptions added
+            Tuple of (PictureItem dictionaries with descriptions added,
+            IDs of pictures whose description failed after retries)
         """
         if not options.get("describe_images", False):
-            return pictures
+            return pictures, []
 
         provider = options.get("description_provider", ImageDescriptionProvider.NONE)
 
         if provider == ImageDescriptionProvider.NONE or provider == ImageDescriptionProvider.DOCLING:
             # No external descriptions needed
-            return pictures
+            return pictures, []
 
         # Get prompt (handle None values)
         prompt = options.get("description_prompt") or settings.DEFAULT_DESCRIPTION_PROMPT
@@ -120,43 +142,126 @@ class DocumentParser:
             api_key = settings.GEMINI_API_KEY
             if not api_key:
                 print("Warning: GEMINI_API_KEY not set. Skipping image descriptions.")
-                return pictures
+                return pictures, []
 
         elif provider == ImageDescriptionProvider.OPENAI:
             api_key = settings.OPENAI_API_KEY
             if not api_key:
                 print("Warning: OPENAI_API_KEY not set. Skipping image descriptions.")
-                return pictures
+                return pictures, []
         else:
-            return pictures
+            return pictures, []
 
-        # Process each image
-        enriched_pictures = []
-        for picture in pictures:
-            image_uri = picture.get("image_uri")
+        if provider == ImageDescriptionProvider.GEMINI:
+            describe, describe_batch = describe_image_with_gemini, describe_images_with_gemini
+        else:
+            describe, describe_batch = describe_image_with_openai, describe_images_with_openai
 
-            if not image_uri:
-                enriched_pictures.append(picture)
-                continue
+        # PNG bytes of the images to describe, read from disk once
+        image_bytes: Dict[int, bytes] = {}
 
-            # Generate description
-            description = None
+        def describe_picture(index: int) -> bool:
+            picture = pictures[index]
             try:
-                if provider == ImageDescriptionProvider.GEMINI:
-                    description = describe_image_with_gemini(image_uri, prompt, api_key)
-                elif provider == ImageDescriptionProvider.OPENAI:
-                    description = describe_image_with_openai(image_uri, prompt, api_key)
+                image_uri = vlm_image_data_uri(image_bytes.pop(index))
+                description = describe(image_uri, prompt, api_key)
 
                 if description:
                     picture["description"] = description
                     picture["description_provider"] = provider.value
+                    return True
 
             except Exception as e:
                 print(f"Warning: Failed to describe image {picture.get('id')}: {e}")
 
-            enriched_pictures.append(picture)
+            return False
+
+        def describe_pictures(batch: List[int]) -> List[bool]:
+            if len(batch) == 1:
+                return [describe_picture(batch[0])]
+
+            try:
+                image_uris = [vlm_image_data_uri(image_bytes[i]) for i in batch]
+                descriptions = describe_batch(image_uris, prompt, api_key)
+            except Exception as e:
+                print(f"Warning: Failed to prepare image batch: {e}")
+                descriptions = [None] * len(batch)
+
+            succeeded = []
+            for i, description in zip(batch, descriptions):
+                if description:
+                    del image_bytes[i]
+                    pictures[i]["description"] = description
+                    pictures[i]["description_provider"] = provider.value
+                    succeeded.append(True)
+                else:
+                    # Missing from the batched reply - fall back to a single-image request
+                    succeeded.append(describe_picture(i))
+
+            return succeeded
+
+        indices = []
+        for i, picture in enumerate(pictures):
+            if not picture.get("image_url"):
+                continue
+            if settings.SKIP_DECORATIVE_IMAGES and _is_decorative(picture):
+                picture["description_skipped"] = "decorative"
+                continue
+            indices.append(i)
+
+        if not indices:
+            return pictures, []
+
+        # Identical images (e.g. a logo repeated on every page) are described once
+        duplicates: Dict[str, List[int]] = {}
+        for i in indices:
+            data = job_image_path(job_id, i).read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            if digest not in duplicates:
+                image_bytes[i] = data
+            duplicates.setdefault(digest, []).append(i)
+
+        # Reuse descriptions of images seen before
+        model = settings.GEMINI_MODEL if provider == ImageDescriptionProvider.GEMINI else settings.OPENAI_MODEL
+        pending = []
+        for digest, group in duplicates.items():
+            cached = (
+                description_cache.get(digest, model, prompt)
+                if settings.DESCRIPTION_CACHE_ENABLED else None
+            )
+            if cached is None:
+                pending.append((digest, group))
+                continue
+
+            for i in group:
+                pictures[i]["description"] = cached
+                pictures[i]["description_provider"] = provider.value
+
+        if not pending:
+            return pictures, []
+
+        # Describe images in parallel, VLM_BATCH_SIZE per request - each call is a network round-trip
+        leaders = [group[0] for _, group in pending]
+        batch_size = max(1, settings.VLM_BATCH_SIZE)
+        batches = [leaders[start:start + batch_size] for start in range(0, len(leaders), batch_size)]
+        with ThreadPoolExecutor(max_workers=min(settings.VLM_CONCURRENCY, len(batches))) as executor:
+            succeeded = [ok for batch in executor.map(describe_pictures, batches) for ok in batch]
+
+        failures = []
+        for (digest, group), ok in zip(pending, succeeded):
+            if not ok:
+                failures.extend(pictures[i]["id"] for i in group)
+                continue
+
+            described = pictures[group[0]]
+            if settings.DESCRIPTION_CACHE_ENABLED:
+                description_cache.put(digest, model, prompt, described["description"])
+
+            for i in group[1:]:
+                pictures[i]["description"] = described["description"]
+                pictures[i]["description_provider"] = described["description_provider"]
 
-        return enriched_pictures
+        return pictures, failures
 
     def parse_document(self, job_id: str, file_path: Path,
                       parsing_mode: ParsingMode,
@@ -177,23 +282,13 @@ class DocumentParser:
             # Update job status
             job_storage.update_job_status(job_id, JobStatus.PROCESSING, progress_percent=10)
 
-            # Configure pipeline
-            pipeline_options = self._configure_pipeline_options(parsing_mode, options)
-
-            # Initialize converter
-            converter = DocumentConverter(
-                format_options={
-                    InputFormat.PDF: PdfFormatOption(
-                        pipeline_options=pipeline_options
-                    )
-                }
-            )
-
-            job_storage.update_job_status(job_id, JobStatus.PROCESSING, progress_percent=30)
+            # Borrow a converter (cached per pipeline configuration)
+            with _checkout_converter(_converter_key(parsing_mode, options)) as converter:
+                job_storage.update_job_status(job_id, JobStatus.PROCESSING, progress_percent=30)
 
-            # Convert document
-            start_time = time.time()
-            result = converter.convert(str(file_path))
+                # Convert document
+                start_time = time.time()
+                result = converter.convert(str(file_path))
             conversion_time = (time.time() - start_time) * 1000  # milliseconds
 
             job_storage.update_job_status(job_id, JobStatus.PROCESSING, progress_percent=60)
@@ -206,36 +301,49 @@ class DocumentParser:
 
             # Get original filename from job
             job_data = job_storage.get_job(job_id)
-            filename = job_data.get("filename", file_path.name) if job_data else file_path.name
+            filename = job_data.filename if job_data else file_path.name
 
-            # Extract all data
-            metadata = extract_metadata(doc, result, filename, file_size)
-            statistics = extract_statistics(doc)
-            pages = extract_pages(doc)
-            texts = extract_texts(doc)
-            tables = extract_tables(doc)
-            pictures = extract_pictures(doc)
+            # Extract pictures first: enrichment only needs them and is network-bound,
+            # so it runs in the background while the rest of the document is extracted
+            pictures_dict = [pic.model_dump() for pic in extract_pictures(doc, job_id)]
 
-            job_storage.update_job_status(job_id, JobStatus.PROCESSING, progress_percent=70)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # Enrich images with AI descriptions if requested (Gemini/OpenAI)
+                # Note: Docling descriptions are already included in extract_pictures
+                enrichment = executor.submit(
+                    self._enrich_images_with_descriptions, job_id, pictures_dict, options
+                )
 
-            # Enrich images with AI descriptions if requested (Gemini/OpenAI)
-            # Note: Docling descriptions are already included in extract_pictures
-            pictures_dict = [pic.dict() if hasattr(pic, 'dict') else pic for pic in pictures]
-            pictures_dict = self._enrich_images_with_descriptions(pictures_dict, options)
+                # Extract remaining data
+                metadata = extract_metadata(doc, result, filename, file_size)
+                statistics = extract_statistics(doc)
+                pages = extract_pages(doc)
+                texts = extract_texts(doc)
+                tables = extract_tables(doc) if options.get("extract_tables", settings.DEFAULT_EXTRACT_TABLES) else []
 
-            job_storage.update_job_status(job_id, JobStatus.PROCESSING, progress_percent=80)
+                # Export markdown
+                markdown = doc.export_to_markdown() if hasattr(doc, 'export_to_markdown') else ""
 
-            # Export markdown
-            markdown = doc.export_to_markdown() if hasattr(doc, 'export_to_markdown') else ""
+                # Everything needed has been extracted - release the Docling
+                # document while enrichment finishes
+                del doc, result
 
-            # Build content object
-            content = DocumentContent(
-                markdown=markdown,
-                pages=pages,
-                texts=texts,
-                tables=tables,
-                pictures=pictures_dict
-            )
+                job_storage.update_job_status(job_id, JobStatus.PROCESSING, progress_percent=70)
+
+                pictures_dict, enrichment_failures = enrichment.result()
+
+            job_storage.update_job_status(job_id, JobStatus.PROCESSING, progress_percent=80)
+
+            # Build content (DocumentContent layout) - pages and texts are extracted as
+            # dicts, tables are dumped exactly once; pictures were dumped before
+            # enrichment and are used as-is
+            content = {
+                "markdown": markdown,
+                "pages": pages,
+                "texts": texts,
+                "tables": [table.model_dump() for table in tables],
+                "pictures": pictures_dict
+            }
 
             job_storage.update_job_status(job_id, JobStatus.PROCESSING, progress_percent=90)
 
@@ -243,9 +351,10 @@ class DocumentParser:
             result_data = {
                 "job_id": job_id,
                 "status": JobStatus.COMPLETED,
-                "metadata": metadata.dict(),
-                "statistics": statistics.dict(),
-                "content": content.dict(),
+                "metadata": metadata.model_dump(),
+                "statistics": statistics.model_dump(),
+                "content": content,
+                "enrichment_failures": enrichment_failures,
                 "exports": {
                     "markdown_url": f"/api/v1/parse/results/{job_id}/export/markdown",
                     "json_url": f"/api/v1/parse/results/{job_id}/export/json",
@@ -262,6 +371,9 @@ class DocumentParser:
             return result_data
 
         except Exception as e:
+            # Drop any images already written for this job
+            cleanup_job_output(job_id)
+
             # Update job status to failed
             error_message = f"Parsing failed: {str(e)}"
             job_storage.update_job_status(
@@ -275,11 +387,192 @@ class DocumentParser:
             # Cleanup temporary files
             cleanup_job_files(job_id)
 
+            # Docling documents and conversion results (and tracebacks of failed
+            # parses) hold reference cycles around large page/image buffers;
+            # collect them now rather than whenever the oldest generation next runs
+            gc.collect()
+
 
 # Global parser instance
 document_parser = DocumentParser()
 
 
+def _is_decorative(picture: Dict[str, Any]) -> bool:
+    """
+    Check whether a picture is too small to be worth describing (logos, icons, bullets)
+
+    Args:
+        picture: PictureItem dictionary
+
+    Returns:
+        True if the picture's bounding box is below the size thresholds
+    """
+    bbox = picture.get("bbox")
+    if not bbox:
+        return False
+
+    width = abs(bbox["right"] - bbox["left"])
+    height = abs(bbox["top"] - bbox["bottom"])
+    return min(width, height) < settings.MIN_IMAGE_SIZE or width * height < settings.MIN_IMAGE_AREA
+
+
+def _converter_key(parsing_mode: ParsingMode, options: Dict[str, Any]) -> Tuple:
+    """
+    Hashable projection of the options that affect the Docling pipeline
+
+    Args:
+        parsing_mode: Parsing mode
+        options: Custom parsing options
+
+    Returns:
+        Tuple usable as a converter cache key
+    """
+    parsing_mode = ParsingMode(parsing_mode)
+    extract_images = options.get("extract_images", settings.DEFAULT_EXTRACT_IMAGES)
+    use_docling_vlm = (
+        options.get("describe_images", False)
+        and options.get("description_provider", ImageDescriptionProvider.NONE) == ImageDescriptionProvider.DOCLING
+    )
+
+    # The scale only matters when this job renders pictures at the requested
+    # scale (fast and high-quality modes override it). Round it to half steps
+    # so arbitrary client values don't each build a converter with its own models.
+    images_scale = None
+    if extract_images and parsing_mode not in (ParsingMode.FAST, ParsingMode.HIGH_QUALITY):
+        images_scale = options.get("images_scale", settings.DEFAULT_IMAGE_SCALE)
+        images_scale = min(4.0, max(1.0, round(float(images_scale) * 2) / 2))
+
+    return (
+        parsing_mode,
+        extract_images,
+        options.get("extract_tables", settings.DEFAULT_EXTRACT_TABLES),
+        images_scale,
+        use_docling_vlm,
+        options.get("description_prompt") if use_docling_vlm else None
+    )
+
+
+@lru_cache(maxsize=32)
+def _pipeline_for(options_key: Tuple) -> PdfPipelineOptions:
+    """
+    Build PdfPipelineOptions for a pipeline configuration once.
+    The returned object is shared, so treat it as read-only.
+
+    Args:
+        options_key: Key from _converter_key()
+
+    Returns:
+        Cached PdfPipelineOptions
+    """
+    (parsing_mode, extract_images, extract_tables, images_scale,
+     use_docling_vlm, description_prompt) = options_key
+    options = {
+        "extract_images": extract_images,
+        "extract_tables": extract_tables,
+        "describe_images": use_docling_vlm,
+        "description_provider": ImageDescriptionProvider.DOCLING if use_docling_vlm else ImageDescriptionProvider.NONE,
+        "description_prompt": description_prompt
+    }
+    if images_scale is not None:
+        options["images_scale"] = images_scale
+    return document_parser._configure_pipeline_options(parsing_mode, options)
+
+
+# Idle converters per pipeline configuration, least recently used first.
+# Docling model handles aren't guaranteed thread-safe, so a converter serves
+# one job at a time and concurrent jobs with the same configuration each get
+# their own - at most MAX_CONCURRENT_JOBS converters per configuration.
+_idle_converters: "OrderedDict[Tuple, List[DocumentConverter]]" = OrderedDict()
+_idle_converters_lock = Lock()
+_MAX_CONVERTER_CONFIGS = 8
+
+
+def _build_converter(options_key: Tuple) -> DocumentConverter:
+    """
+    Build a DocumentConverter for a pipeline configuration
+
+    Args:
+        options_key: Key from _converter_key()
+
+    Returns:
+        New DocumentConverter (its models load on first use)
+    """
+    return DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(
+                pipeline_options=_pipeline_for(options_key)
+            )
+        }
+    )
+
+
+@contextmanager
+def _checkout_converter(options_key: Tuple) -> Iterator[DocumentConverter]:
+    """
+    Borrow a converter for a pipeline configuration for one conversion, reusing
+    an idle one so Docling models are only loaded once per concurrent job
+
+    Args:
+        options_key: Key from _converter_key()
+
+    Yields:
+        DocumentConverter used by no other job until the block exits
+    """
+    with _idle_converters_lock:
+        idle = _idle_converters.get(options_key)
+        converter = idle.pop() if idle else None
+
+    if converter is None:
+        converter = _build_converter(options_key)
+
+    try:
+        yield converter
+    finally:
+        with _idle_converters_lock:
+            _idle_converters.setdefault(options_key, []).append(converter)
+            _idle_converters.move_to_end(options_key)
+            # Release the models of the least recently used configurations
+            while len(_idle_converters) > _MAX_CONVERTER_CONFIGS:
+                _idle_converters.popitem(last=False)
+
+
+def _blank_pdf() -> bytes:
+    """Build a minimal one-page PDF used to run a warm-up conversion"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 200] >>",
+    ]
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(pdf)
+
+
+def warmup():
+    """
+    Load Docling models for the configured parsing modes at startup and run
+    a conversion of a blank page, so the first parsing job doesn't pay the
+    model loading or first-inference cost
+    """
+    blank_pdf = _blank_pdf()
+
+    for mode in settings.WARMUP_PARSING_MODES:
+        try:
+            with _checkout_converter(_converter_key(ParsingMode(mode), {})) as converter:
+                converter.convert(DocumentStream(name="warmup.pdf", stream=BytesIO(blank_pdf)))
+        except Exception as e:
+            print(f"Warning: Warm-up failed for parsing mode '{mode}': {e}")
+
+
 def parse_document_task(job_id: str, file_path: Path,
                        parsing_mode: ParsingMode,
                        options: Dict[str, Any]):
@@ -3,86 +3,118 @@ Image Enrichment Utility
 Standalone script for generating detailed image descriptions from parsed documents
 """
 import sys
-import json
 import time
+import base64
+import hashlib
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 import requests
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+import httpx
+import orjson
 from langchain_openai import ChatOpenAI
+from PIL import Image
 
 
-# Configuration
-API_BASE_URL = "http://localhost:8000"
+# uvloop's libuv event loop cuts per-request overhead when many uploads and
+# long-polls are in flight (no Windows build, so fall back to asyncio)
+try:
+    import uvloop
+    run_async = uvloop.run
+except ImportError:
+    run_async = asyncio.run
 
 
-def upload_and_parse(file_path: str) -> Dict[str, Any]:
-    """Upload document and wait for parsing"""
-    print(f"📤 Uploading: {Path(file_path).name}")
-
-    # Upload
-    url = f"{API_BASE_URL}/api/v1/parse/document"
-    with open(file_path, 'rb') as f:
-        response = requests.post(
-            url,
-            files={'file': f},
-            params={
-                'parsing_mode': 'high_quality',
-                'extract_images': True,
-                'images_scale': 3.0
-            }
-        )
-        response.raise_for_status()
+# Configuration
+API_BASE_URL = "http://localhost:8000"
+MAX_CONCURRENT_REQUESTS = 5  # Parallel vision requests (keep within rate limits)
+BATCH_POLL_INTERVAL = 60  # Seconds between OpenAI Batch API status checks
+MAX_IMAGE_EDGE = 1024  # Images are downscaled to this many pixels before description
+MIN_IMAGE_SIZE = 50  # Images smaller than this (points) are treated as decorative and skipped
+VISION_MODEL = "gpt-4o"
 
-    job_id = response.json()['job_id']
-    print(f"Job ID: {job_id}")
+# Descriptions from earlier runs, one file per image/model/prompt
+DESCRIPTION_CACHE_DIR = Path(__file__).parent / "cache" / "descriptions"
 
-    # Wait for completion
-    status_url = f"{API_BASE_URL}/api/v1/parse/jobs/{job_id}"
-    while True:
-        status = requests.get(status_url).json()
-        if status['status'] == 'completed':
-            break
-        elif status['status'] == 'failed':
-            raise Exception(f"Parsing failed: {status.get('error_message')}")
-        time.sleep(2)
+# Shared session for image downloads: keeps connections alive and retries transient errors
+SESSION = requests.Session()
+SESSION.mount(API_BASE_URL, HTTPAdapter(
+    pool_maxsize=32,
+    max_retries=Retry(total=5, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504])
+))
 
-    # Get results
-    results_url = f"{API_BASE_URL}/api/v1/parse/results/{job_id}"
-    return requests.get(results_url).json()
 
+async def upload_and_parse(file_path: str) -> Dict[str, Any]:
+    """
+    Upload document and wait for parsing
 
-def enrich_image(image: Dict[str, Any], index: int, llm: ChatOpenAI) -> Dict[str, Any]:
+    The file is streamed from disk rather than buffered into one multipart
+    body, and waiting doesn't block the event loop, so several documents
+    can be processed concurrently with asyncio.gather.
     """
-    Generate rich description for a single image
+    print(f"📤 Uploading: {Path(file_path).name}")
 
-    Args:
-        image: Image data from API
-        index: Image number
-        llm: Vision model
+    async with httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        timeout=httpx.Timeout(60.0),
+        transport=httpx.AsyncHTTPTransport(retries=3)
+    ) as client:
+        # Upload
+        with open(file_path, 'rb') as f:
+            response = await client.post(
+                "/api/v1/parse/document",
+                files={'file': (Path(file_path).name, f)},
+                params={
+                    'parsing_mode': 'high_quality',
+                    'extract_images': True,
+                    'images_scale': 3.0
+                }
+            )
+            response.raise_for_status()
+
+        job_id = response.json()['job_id']
+        print(f"Job ID: {job_id}")
+
+        # Wait for completion - poll quickly at first, then back off for long jobs
+        status_url = f"/api/v1/parse/jobs/{job_id}"
+        delay = 0.1
+        etag = None
+        status = None
+        while True:
+            response = await client.get(status_url, headers={'If-None-Match': etag} if etag else {})
+            if response.status_code != 304:
+                response.raise_for_status()
+                status = response.json()
+                etag = response.headers.get('ETag')
+
+            if status['status'] == 'completed':
+                break
+            elif status['status'] == 'failed':
+                raise Exception(f"Parsing failed: {status.get('error_message')}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 5.0)
+
+        # Get only what this script uses - metadata, statistics and the picture list -
+        # instead of the full result with markdown, texts and tables
+        results_url = f"/api/v1/parse/results/{job_id}"
+        response = await client.get(results_url, params={'fields': 'metadata,statistics'})
+        response.raise_for_status()
+        result = response.json()
 
-    Returns:
-        Enriched image data
-    """
-    print(f"\n🖼️  Image {index}")
-    print(f"   Page: {image.get('page', '?')}")
-    print(f"   Original Caption: {image.get('caption', 'None')}")
+        response = await client.get(f"{results_url}/images")
+        response.raise_for_status()
+        result['content'] = {'pictures': response.json()['images']}
 
-    if not image.get('image_uri'):
-        print("   ⚠️  No image data available")
-        return {
-            **image,
-            'enriched_description': image.get('caption', 'No description available')
-        }
+    return result
 
-    # Generate description
-    messages = [
-        {
-            "role": "user",
-            "content": [
-                {
-                    "type": "text",
-                    "text": """Analyze this image from a document and provide a comprehensive description.
+
+VISION_PROMPT = """Analyze this image from a document and provide a comprehensive description.
 
 Please include:
 
@@ -109,22 +141,129 @@ Please include:
    - Important visual elements
 
 Be detailed and specific to help with document search and understanding."""
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {"url": image['image_uri']}
-                }
+
+
+# Shared across requests - LangChain and the JSON encoder only read message content
+_VISION_TEXT_PART = {"type": "text", "text": VISION_PROMPT}
+
+
+def build_vision_messages(image_uri: str) -> List[Dict[str, Any]]:
+    """Build the chat messages asking the vision model to describe an image"""
+    return [
+        {
+            "role": "user",
+            "content": [
+                _VISION_TEXT_PART,
+                {"type": "image_url", "image_url": {"url": image_uri}}
             ]
         }
     ]
 
+
+def fetch_image_data_uri(image_url: str) -> str:
+    """
+    Download an extracted image and encode it as a base64 data URI
+
+    The image is shrunk to MAX_IMAGE_EDGE and sent as JPEG, which cuts
+    upload size and vision token cost.
+    """
+    response = SESSION.get(f"{API_BASE_URL}{image_url}")
+    response.raise_for_status()
+
+    with Image.open(BytesIO(response.content)) as image:
+        image.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.LANCZOS)
+        buffer = BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=85)
+
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def description_cache_key(image_uri: str) -> str:
+    """Cache key for an image's description: sha256 of model, prompt and image"""
+    return hashlib.sha256(f"{VISION_MODEL}|{VISION_PROMPT}|{image_uri}".encode("utf-8")).hexdigest()
+
+
+def load_cached_description(cache_key: str) -> Optional[str]:
+    """Description stored by an earlier run, or None"""
     try:
-        response = llm.invoke(messages)
-        description = response.content
+        return (DESCRIPTION_CACHE_DIR / f"{cache_key}.txt").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+def store_cached_description(cache_key: str, description: str):
+    """Save a description so later runs don't re-send the image"""
+    DESCRIPTION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    (DESCRIPTION_CACHE_DIR / f"{cache_key}.txt").write_text(description, encoding="utf-8")
+
 
-        print(f"   ✅ Generated description ({len(description)} chars)")
-        print(f"\n   Description Preview:")
-        print(f"   {description[:200]}...")
+async def enrich_image(image: Dict[str, Any], index: int, llm: ChatOpenAI) -> Dict[str, Any]:
+    """
+    Generate rich description for a single image
+
+    Args:
+        image: Image data from API
+        index: Image number
+        llm: Vision model
+
+    Returns:
+        Enriched image data
+    """
+    if not image.get('image_url'):
+        print(f"\n🖼️  Image {index} (Page {image.get('page', '?')}): ⚠️  No image data available")
+        return {
+            **image,
+            'enriched_description': image.get('caption', 'No description available')
+        }
+
+    bbox = image.get('bbox')
+    if bbox and min(abs(bbox['right'] - bbox['left']), abs(bbox['top'] - bbox['bottom'])) < MIN_IMAGE_SIZE:
+        print(f"\n🖼️  Image {index} (Page {image.get('page', '?')}): ⏭️  Skipped (decorative)")
+        return {
+            **image,
+            'enriched_description': image.get('caption', 'No description available'),
+            'skipped': 'decorative'
+        }
+
+    try:
+        image_uri = await asyncio.to_thread(fetch_image_data_uri, image['image_url'])
+    except Exception as e:
+        print(f"\n🖼️  Image {index}: ❌ Error: {str(e)}")
+        return {
+            **image,
+            'enriched_description': image.get('caption', 'Processing failed'),
+            'has_enrichment': False,
+            'error': str(e)
+        }
+
+    # Same image and prompt as an earlier run - reuse its description
+    cache_key = description_cache_key(image_uri)
+    cached = load_cached_description(cache_key)
+    if cached is not None:
+        print(f"\n🖼️  Image {index} (Page {image.get('page', '?')}): 💾 Cached description")
+        return {
+            **image,
+            'enriched_description': cached,
+            'has_enrichment': True
+        }
+
+    # Generate description
+    messages = build_vision_messages(image_uri)
+
+    try:
+        response = await llm.ainvoke(messages)
+        description = response.content
+        store_cached_description(cache_key, description)
+
+        # Printed as one block since images are processed concurrently
+        print(
+            f"\n🖼️  Image {index}\n"
+            f"   Page: {image.get('page', '?')}\n"
+            f"   Original Caption: {image.get('caption', 'None')}\n"
+            f"   ✅ Generated description ({len(description)} chars)\n"
+            f"\n   Description Preview:\n"
+            f"   {description[:200]}..."
+        )
 
         return {
             **image,
@@ -133,7 +272,7 @@ Be detailed and specific to help with document search and understanding."""
         }
 
     except Exception as e:
-        print(f"   ❌ Error: {str(e)}")
+        print(f"\n🖼️  Image {index}: ❌ Error: {str(e)}")
         return {
             **image,
             'enriched_description': image.get('caption', 'Processing failed'),
@@ -152,12 +291,147 @@ def process_all_images(parse_result: Dict[str, Any]) -> List[Dict[str, Any]]:
 
     print(f"\n🔍 Processing {len(images)} images...")
 
-    llm = ChatOpenAI(model="gpt-4o", temperature=0)
-    enriched_images = []
+    # The OpenAI client retries 429/5xx with exponential backoff and honours Retry-After
+    llm = ChatOpenAI(model=VISION_MODEL, temperature=0, max_retries=6)
+    return run_async(enrich_images_concurrently(images, llm))
+
+
+async def enrich_images_concurrently(images: List[Dict[str, Any]], llm: ChatOpenAI) -> List[Dict[str, Any]]:
+    """Enrich images in parallel, at most MAX_CONCURRENT_REQUESTS at a time (results keep input order)"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def bounded(image: Dict[str, Any], index: int) -> Dict[str, Any]:
+        async with semaphore:
+            return await enrich_image(image, index, llm)
+
+    return await asyncio.gather(*(bounded(image, i) for i, image in enumerate(images, 1)))
 
-    for i, image in enumerate(images, 1):
-        enriched = enrich_image(image, i, llm)
-        enriched_images.append(enriched)
+
+def process_all_images_batch(parse_result: Dict[str, Any], state_file: Path) -> List[Dict[str, Any]]:
+    """
+    Describe all images through the OpenAI Batch API (half the cost, results within 24h)
+
+    Images described by an earlier run are served from the description
+    cache and left out of the batch. The batch ID is saved to state_file
+    so an interrupted run resumes waiting on the same batch instead of
+    submitting a new one.
+
+    Args:
+        parse_result: Parse result from the API
+        state_file: Where to persist the pending batch ID
+
+    Returns:
+        Enriched image data
+    """
+    from openai import OpenAI
+
+    images = parse_result['content']['pictures']
+
+    if not images:
+        print("ℹ️  No images found in document")
+        return []
+
+    client = OpenAI(max_retries=6)
+
+    # Picture ID -> description cache key, kept in the state file so a
+    # resumed run can store the batch's descriptions without re-downloading
+    batch_id = None
+    if state_file.exists():
+        state = orjson.loads(state_file.read_bytes())
+        batch_id = state['batch_id']
+        cache_keys = state.get('cache_keys', {})
+        print(f"\n🔁 Resuming batch {batch_id}")
+    else:
+        to_describe = [image for image in images if image.get('image_url')]
+        print(f"\n📦 Preparing {len(to_describe)} images...")
+
+        # One chat completion request per uncached image, keyed by picture ID.
+        # Downloads and downscaling run on a thread pool - Pillow's resize and
+        # JPEG encoder release the GIL, so images are prepared in parallel
+        cache_keys = {}
+        pending = 0
+        with tempfile.NamedTemporaryFile('wb', suffix='.jsonl', delete=False) as f, \
+                ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            image_uris = executor.map(fetch_image_data_uri, [image['image_url'] for image in to_describe])
+            for image, image_uri in zip(to_describe, image_uris):
+                cache_key = cache_keys[image['id']] = description_cache_key(image_uri)
+                if load_cached_description(cache_key) is not None:
+                    continue
+                pending += 1
+                f.write(orjson.dumps({
+                    "custom_id": image['id'],
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": VISION_MODEL,
+                        "temperature": 0,
+                        "messages": build_vision_messages(image_uri)
+                    }
+                }) + b"\n")
+            requests_path = Path(f.name)
+
+        print(f"   {len(to_describe) - pending} cached, {pending} to describe")
+
+        try:
+            if pending:
+                with open(requests_path, 'rb') as f:
+                    input_file = client.files.create(file=f, purpose="batch")
+        finally:
+            requests_path.unlink()
+
+        if pending:
+            batch = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            batch_id = batch.id
+            state_file.write_bytes(orjson.dumps({'batch_id': batch_id, 'cache_keys': cache_keys}))
+            print(f"   Batch ID: {batch_id}")
+
+    descriptions = {}
+    if batch_id:
+        # Wait for the batch to finish
+        while True:
+            batch = client.batches.retrieve(batch_id)
+            if batch.status in ("completed", "failed", "expired", "cancelled"):
+                break
+            counts = batch.request_counts
+            print(f"   ⏳ {batch.status} ({counts.completed}/{counts.total} done)")
+            time.sleep(BATCH_POLL_INTERVAL)
+
+        print(f"   Batch finished: {batch.status}")
+
+        # Collect descriptions (expired batches may still have partial output)
+        if batch.output_file_id:
+            for line in client.files.content(batch.output_file_id).content.splitlines():
+                record = orjson.loads(line)
+                response = record.get('response') or {}
+                if response.get('status_code') == 200:
+                    description = response['body']['choices'][0]['message']['content']
+                    descriptions[record['custom_id']] = description
+                    if record['custom_id'] in cache_keys:
+                        store_cached_description(cache_keys[record['custom_id']], description)
+
+        state_file.unlink(missing_ok=True)
+
+    enriched_images = []
+    for image in images:
+        description = descriptions.get(image['id'])
+        if description is None and image['id'] in cache_keys:
+            description = load_cached_description(cache_keys[image['id']])
+        if description:
+            enriched_images.append({
+                **image,
+                'enriched_description': description,
+                'has_enrichment': True
+            })
+        else:
+            enriched_images.append({
+                **image,
+                'enriched_description': image.get('caption', 'Processing failed'),
+                'has_enrichment': False
+            })
 
     return enriched_images
 
@@ -176,11 +450,10 @@ def save_results(enriched_images: List[Dict[str, Any]], output_file: str):
             'enriched_description': img.get('enriched_description'),
             'has_enrichment': img.get('has_enrichment', False),
             'bbox': img.get('bbox'),
-            'has_image_data': bool(img.get('image_uri'))
+            'has_image_data': bool(img.get('image_url'))
         })
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    output_path.write_bytes(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
 
     print(f"\n💾 Saved results to: {output_path}")
 
@@ -206,15 +479,20 @@ def display_summary(enriched_images: List[Dict[str, Any]]):
 
 def main():
     """Main execution"""
-    if len(sys.argv) < 2:
-        print("Usage: python image_enrichment.py <document_path> [output_file]")
+    # --batch submits images via the OpenAI Batch API instead of live requests
+    enrichment_mode = "batch" if "--batch" in sys.argv else "sync"
+    args = [arg for arg in sys.argv[1:] if arg != "--batch"]
+
+    if len(args) < 1:
+        print("Usage: python image_enrichment.py <document_path> [output_file] [--batch]")
         print("\nExample:")
         print("  python image_enrichment.py report.pdf")
         print("  python image_enrichment.py report.pdf enriched_images.json")
+        print("  python image_enrichment.py report.pdf enriched_images.json --batch")
         sys.exit(1)
 
-    file_path = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else "enriched_images.json"
+    file_path = args[0]
+    output_file = args[1] if len(args) > 1 else "enriched_images.json"
 
     if not Path(file_path).exists():
         print(f"❌ Error: File not found: {file_path}")
@@ -222,7 +500,7 @@ def main():
 
     try:
         # Parse document
-        result = upload_and_parse(file_path)
+        result = run_async(upload_and_parse(file_path))
 
         # Display document info
         print("\n📄 Document Information:")
@@ -231,7 +509,10 @@ def main():
         print(f"   Images: {result['statistics']['total_pictures']}")
 
         # Process images
-        enriched_images = process_all_images(result)
+        if enrichment_mode == "batch":
+            enriched_images = process_all_images_batch(result, Path(output_file).with_suffix(".batch.json"))
+        else:
+            enriched_images = process_all_images(result)
 
         if enriched_images:
             # Display summary
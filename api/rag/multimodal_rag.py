@@ -2,32 +2,142 @@
 Multimodal RAG Pipeline with Images
 Demonstrates advanced RAG with image understanding using vision models
 """
+import os
 import sys
-import time
+import select
+import asyncio
+import hashlib
+from functools import lru_cache
+import base64
 import requests
+import httpx
+import faiss
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain_community.cross_encoders import HuggingFaceCrossEncoder
+
+
+# uvloop's libuv event loop cuts per-request overhead when many uploads and
+# long-polls are in flight (no Windows build, so fall back to asyncio)
+try:
+    import uvloop
+    run_async = uvloop.run
+except ImportError:
+    run_async = asyncio.run
 
 
 # Configuration
 API_BASE_URL = "http://localhost:8000"
 PARSING_MODE = "high_quality"  # Better for image extraction
 IMAGE_SCALE = 3.0  # Higher quality for vision models
+VISION_MODEL = "gpt-4o"
+CHUNK_SIZE = 1000  # Characters per chunk
+CHUNK_OVERLAP = 200  # Overlap between chunks
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = 512  # Texts per embeddings request
+IVF_MIN_VECTORS = 10_000  # Below this, exact search is fast enough (and exact)
+IVF_NPROBE = 8  # Clusters searched per query in the IVF index
+RERANKER_MODEL = "BAAI/bge-reranker-base"
+RERANK_CANDIDATES = 20  # Chunks retrieved for the cross-encoder to rerank
+MAX_CONCURRENT_REQUESTS = 5  # Parallel vision requests (keep within rate limits)
+MIN_DESCRIPTIVE_CAPTION_WORDS = 8  # Captions this long are used instead of a vision call
+API_TIMEOUT = 60.0  # Seconds per request (covers uploads and long-polls)
+STATUS_WAIT_TIMEOUT = 30  # Seconds the server holds each status request
+PASTE_WINDOW = 0.05  # Seconds to wait for more pasted questions in interactive mode
+QUIT_WORDS = {'quit', 'exit', 'q'}  # Lines that end interactive mode
+MAX_CONCURRENT_DOCUMENTS = 4  # Documents parsed at once by parse_documents
+
+# Keep-alive connections shared by the image downloads
+SESSION = requests.Session()
+
+TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP,
+    length_function=len
+)
+
+# Embeddings, vision descriptions and FAISS indexes from earlier runs
+CACHE_DIR = Path(__file__).parent / "cache"
+DESCRIPTION_STORE = LocalFileStore(str(CACHE_DIR / "descriptions"))
+
+
+@lru_cache(maxsize=8)
+def get_chat_model(model: str) -> ChatOpenAI:
+    """Shared chat client per model, so its HTTP connection pool stays warm across calls"""
+    # Built-in retries back off exponentially on 429s
+    return ChatOpenAI(model=model, temperature=0, max_retries=6)
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Optional[HuggingFaceCrossEncoder]:
+    """Local cross-encoder for reranking retrieved chunks, or None if sentence-transformers isn't installed"""
+    try:
+        return HuggingFaceCrossEncoder(model_name=RERANKER_MODEL)
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> CacheBackedEmbeddings:
+    """OpenAI embeddings cached on disk by chunk text, so each chunk is embedded once"""
+    return CacheBackedEmbeddings.from_bytes_store(
+        OpenAIEmbeddings(model=EMBEDDING_MODEL, chunk_size=EMBEDDING_BATCH_SIZE, max_retries=6),
+        LocalFileStore(str(CACHE_DIR / "embeddings")),
+        namespace=EMBEDDING_MODEL
+    )
 
 
-def upload_document(file_path: str) -> str:
+def index_cache_dir(file_path: str) -> Path:
+    """Cache location of a document's FAISS index, keyed by path, mtime and parsing mode"""
+    path = Path(file_path).resolve()
+    key = f"{path}|{path.stat().st_mtime_ns}|{PARSING_MODE}"
+    return CACHE_DIR / "faiss" / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def build_faiss_index(vectors: List[List[float]]) -> faiss.Index:
+    """
+    Build a cosine-similarity FAISS index from embedding vectors
+
+    Vectors go in as one contiguous float32 array. Small corpora use exact
+    search; large ones an inverted-file index that probes only the nearest
+    IVF_NPROBE of ~sqrt(N) clusters per query.
+    """
+    arr = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(arr)
+    dim = arr.shape[1]
+
+    if len(arr) < IVF_MIN_VECTORS:
+        index = faiss.IndexFlatIP(dim)
+    else:
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, int(np.sqrt(len(arr))), faiss.METRIC_INNER_PRODUCT)
+        index.train(arr)
+        index.nprobe = IVF_NPROBE
+
+    index.add(arr)
+    return index
+
+
+async def upload_document(client: httpx.AsyncClient, file_path: str) -> str:
     """Upload document with high-quality image extraction"""
     print(f"📤 Uploading document: {Path(file_path).name}")
 
-    url = f"{API_BASE_URL}/api/v1/parse/document"
-
+    # httpx streams the file from disk in chunks instead of building the whole
+    # multipart body in memory like requests does
     with open(file_path, 'rb') as f:
-        files = {'file': f}
+        files = {'file': (Path(file_path).name, f)}
         params = {
             'parsing_mode': PARSING_MODE,
             'extract_images': True,
@@ -35,7 +145,7 @@ def upload_document(file_path: str) -> str:
             'images_scale': IMAGE_SCALE
         }
 
-        response = requests.post(url, files=files, params=params)
+        response = await client.post("/api/v1/parse/document", files=files, params=params)
         response.raise_for_status()
 
     result = response.json()
@@ -43,15 +153,22 @@ def upload_document(file_path: str) -> str:
     return result['job_id']
 
 
-def wait_for_completion(job_id: str, poll_interval: int = 2) -> Dict[str, Any]:
-    """Poll job status until completion"""
-    status_url = f"{API_BASE_URL}/api/v1/parse/jobs/{job_id}"
+async def wait_for_completion(client: httpx.AsyncClient, job_id: str) -> Dict[str, Any]:
+    """Long-poll job status until completion"""
+    status_url = f"/api/v1/parse/jobs/{job_id}"
+    params = {'wait': 'true', 'timeout': STATUS_WAIT_TIMEOUT}
 
     print("⏳ Waiting for document processing...")
 
+    etag = None
     while True:
-        response = requests.get(status_url)
+        # The server holds the request until the status changes
+        response = await client.get(status_url, params=params, headers={'If-None-Match': etag} if etag else {})
+        if response.status_code == 304:
+            continue
         response.raise_for_status()
+
+        etag = response.headers.get('ETag')
         status = response.json()
 
         print(f"   Status: {status['status']} - Progress: {status.get('progress_percent', 0)}%")
@@ -62,40 +179,26 @@ def wait_for_completion(job_id: str, poll_interval: int = 2) -> Dict[str, Any]:
         elif status['status'] == 'failed':
             raise Exception(f"Processing failed: {status.get('error_message')}")
 
-        time.sleep(poll_interval)
-
-    results_url = f"{API_BASE_URL}/api/v1/parse/results/{job_id}"
-    response = requests.get(results_url)
+    response = await client.get(f"/api/v1/parse/results/{job_id}")
     response.raise_for_status()
 
     return response.json()
 
 
-def enrich_image_with_vision(image_data: Dict[str, Any], llm_vision: ChatOpenAI) -> str:
-    """
-    Generate detailed description of image using GPT-4 Vision
+async def parse_documents(file_paths: List[str]) -> List[Dict[str, Any]]:
+    """Upload and parse several documents concurrently (results keep input order)"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOCUMENTS)
 
-    Args:
-        image_data: Image metadata with base64 URI
-        llm_vision: Vision-capable LLM
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=httpx.Timeout(API_TIMEOUT)) as client:
+        async def parse(file_path: str) -> Dict[str, Any]:
+            async with semaphore:
+                job_id = await upload_document(client, file_path)
+                return await wait_for_completion(client, job_id)
 
-    Returns:
-        Detailed image description
-    """
-    caption = image_data.get('caption', '')
-    image_uri = image_data.get('image_uri')
+        return await asyncio.gather(*(parse(file_path) for file_path in file_paths))
 
-    if not image_uri:
-        return caption or "Image without data"
 
-    # Create vision prompt
-    messages = [
-        {
-            "role": "user",
-            "content": [
-                {
-                    "type": "text",
-                    "text": """Analyze this image from a document and provide a detailed description for a search system.
+VISION_PROMPT = """Analyze this image from a document and provide a detailed description for a search system.
 
 Include:
 1. Type of visual (chart, diagram, photo, table, etc.)
@@ -105,18 +208,107 @@ Include:
 5. Colors, labels, and visual elements
 
 Be specific and detailed to help with document search and question answering."""
-                },
+
+# Shared across requests - LangChain only reads message content
+_VISION_TEXT_PART = {"type": "text", "text": VISION_PROMPT}
+
+QA_SYSTEM_PROMPT = (
+    "You are a helpful assistant analyzing documents. Answer questions based on the provided "
+    "text and image descriptions. Be specific and reference the sources."
+)
+
+_QA_SYSTEM_MESSAGE = {"role": "system", "content": QA_SYSTEM_PROMPT}
+
+
+def fetch_image_data_uri(image_url: str) -> str:
+    """Download an extracted image and encode it as a base64 data URI"""
+    response = SESSION.get(f"{API_BASE_URL}{image_url}")
+    response.raise_for_status()
+    return "data:image/png;base64," + base64.b64encode(response.content).decode("ascii")
+
+
+# Descriptions produced this run, keyed like DESCRIPTION_STORE - repeated
+# images (logos, page headers) wait on the first occurrence's call
+_descriptions: Dict[str, Future] = {}
+_descriptions_lock = Lock()
+
+
+def describe_image(image_uri: str, llm_vision: ChatOpenAI) -> str:
+    """
+    Describe an image with the vision model, at most once per distinct image
+
+    Args:
+        image_uri: Base64 data URI of the image
+        llm_vision: Vision-capable LLM
+
+    Returns:
+        Image description
+    """
+    cache_key = hashlib.sha256(f"{VISION_MODEL}|{VISION_PROMPT}|{image_uri}".encode("utf-8")).hexdigest()
+
+    with _descriptions_lock:
+        future = _descriptions.get(cache_key)
+        if future is not None:
+            owner = False
+        else:
+            owner = True
+            future = _descriptions[cache_key] = Future()
+
+    if not owner:
+        return future.result()
+
+    try:
+        # Same image and prompt as an earlier run - reuse its description
+        cached = DESCRIPTION_STORE.mget([cache_key])[0]
+        if cached is not None:
+            description = cached.decode("utf-8")
+        else:
+            messages = [
                 {
-                    "type": "image_url",
-                    "image_url": {"url": image_uri}
+                    "role": "user",
+                    "content": [
+                        _VISION_TEXT_PART,
+                        {"type": "image_url", "image_url": {"url": image_uri}}
+                    ]
                 }
             ]
-        }
-    ]
+            description = llm_vision.invoke(messages).content
+            DESCRIPTION_STORE.mset([(cache_key, description.encode("utf-8"))])
+    except Exception as e:
+        # Let later occurrences try again
+        with _descriptions_lock:
+            del _descriptions[cache_key]
+        future.set_exception(e)
+        raise
+
+    future.set_result(description)
+    return description
+
+
+def enrich_image_with_vision(image_data: Dict[str, Any], llm_vision: ChatOpenAI) -> str:
+    """
+    Generate detailed description of image using GPT-4 Vision
+
+    Args:
+        image_data: Image metadata with image URL
+        llm_vision: Vision-capable LLM
+
+    Returns:
+        Detailed image description
+    """
+    caption = image_data.get('caption') or ''  # The API sends null for pictures without a caption
+    image_url = image_data.get('image_url')
+
+    if not image_url:
+        return caption or "Image without data"
+
+    # A full-sentence caption already describes the image well enough for
+    # search - skip the download and the vision call
+    if len(caption.split()) >= MIN_DESCRIPTIVE_CAPTION_WORDS:
+        return caption
 
     try:
-        response = llm_vision.invoke(messages)
-        description = response.content
+        description = describe_image(fetch_image_data_uri(image_url), llm_vision)
 
         # Combine caption and description
         if caption:
@@ -141,7 +333,7 @@ def create_multimodal_documents(parse_result: Dict[str, Any]) -> List[Document]:
     print("📄 Creating multimodal document chunks...")
 
     documents = []
-    llm_vision = ChatOpenAI(model="gpt-4o", temperature=0)
+    llm_vision = get_chat_model(VISION_MODEL)
 
     # Add text items
     print("   Processing text items...")
@@ -180,50 +372,98 @@ def create_multimodal_documents(parse_result: Dict[str, Any]) -> List[Document]:
     if images:
         print(f"   Processing {len(images)} images with vision model...")
 
-        for i, image in enumerate(images, 1):
-            print(f"      Image {i}/{len(images)}...", end=" ")
-
-            # Generate detailed description
-            description = enrich_image_with_vision(image, llm_vision)
-
-            doc = Document(
-                page_content=description,
-                metadata={
-                    'type': 'image',
-                    'page': image.get('page'),
-                    'image_id': image['id'],
-                    'image_uri': image.get('image_uri'),  # Store for later retrieval
-                    'source': parse_result['metadata']['filename']
-                }
-            )
-            documents.append(doc)
-            print("✓")
+        # Requests overlap on the network; map() keeps results in input order
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            descriptions = executor.map(lambda image: enrich_image_with_vision(image, llm_vision), images)
+
+            for i, (image, description) in enumerate(zip(images, descriptions), 1):
+                doc = Document(
+                    page_content=description,
+                    metadata={
+                        'type': 'image',
+                        'page': image.get('page'),
+                        'image_id': image['id'],
+                        'image_url': image.get('image_url'),  # Store for later retrieval
+                        'source': parse_result['metadata']['filename']
+                    }
+                )
+                documents.append(doc)
+                print(f"      Image {i}/{len(images)} ✓")
 
     print(f"✅ Created {len(documents)} multimodal chunks")
     return documents
 
 
+def split_documents(documents: List[Document]) -> List[Document]:
+    """Split documents longer than CHUNK_SIZE; the API's paragraph-level items mostly fit as-is"""
+    split_docs = []
+    for doc in documents:
+        if len(doc.page_content) <= CHUNK_SIZE:
+            split_docs.append(doc)
+        else:
+            split_docs.extend(TEXT_SPLITTER.split_documents([doc]))
+    return split_docs
+
+
 def build_vector_store(documents: List[Document]) -> FAISS:
     """Build FAISS vector store from multimodal documents"""
     print("🔧 Building vector store...")
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len
-    )
-
-    split_docs = text_splitter.split_documents(documents)
+    # Image descriptions stay whole - one chunk per image keeps its context
+    # together and skips copying its metadata into every split
+    split_docs = split_documents([doc for doc in documents if doc.metadata['type'] != 'image'])
+    split_docs.extend(doc for doc in documents if doc.metadata['type'] == 'image')
     print(f"   Split into {len(split_docs)} chunks")
 
-    embeddings = OpenAIEmbeddings()
-    vectorstore = FAISS.from_documents(split_docs, embeddings)
+    # Embed all chunks up front in large batched requests (cached chunks are
+    # skipped), then index the vectors
+    embeddings = get_embeddings()
+    vectors = embeddings.embed_documents([doc.page_content for doc in split_docs])
+    vectorstore = FAISS(
+        embedding_function=embeddings,
+        index=build_faiss_index(vectors),
+        docstore=InMemoryDocstore({str(i): doc for i, doc in enumerate(split_docs)}),
+        index_to_docstore_id={i: str(i) for i in range(len(split_docs))},
+        normalize_L2=True,  # Queries are normalized too, so inner product = cosine
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+    )
 
     print("✅ Vector store created")
     return vectorstore
 
 
-def query_multimodal(vectorstore: FAISS, query: str, k: int = 4) -> str:
+def retrieve(vectorstore: FAISS, query: str, k: int,
+             query_vector: Optional[List[float]] = None) -> List[Document]:
+    """
+    Retrieve the k most relevant documents for a query
+
+    With a reranker, RERANK_CANDIDATES documents are fetched and scored by
+    the cross-encoder in one batch, so fewer but better chunks (and image
+    descriptions) reach the vision model's prompt.
+
+    Args:
+        vectorstore: FAISS vector store
+        query: User question
+        k: Number of results to retrieve
+        query_vector: Precomputed embedding of the question (embedded here if None)
+    """
+    if query_vector is None:
+        query_vector = vectorstore.embedding_function.embed_query(query)
+
+    reranker = get_reranker()
+    if reranker is None:
+        return vectorstore.similarity_search_by_vector(query_vector, k=k)
+
+    candidates = vectorstore.similarity_search_by_vector(query_vector, k=RERANK_CANDIDATES)
+    if not candidates:
+        return candidates
+
+    scores = reranker.score([(query, doc.page_content) for doc in candidates])
+    return [candidates[i] for i in np.argsort(scores)[::-1][:k]]
+
+
+def query_multimodal(vectorstore: FAISS, query: str, k: int = 4,
+                     query_vector: Optional[List[float]] = None) -> str:
     """
     Query documents with multimodal context
 
@@ -231,6 +471,7 @@ def query_multimodal(vectorstore: FAISS, query: str, k: int = 4) -> str:
         vectorstore: FAISS vector store
         query: User question
         k: Number of results to retrieve
+        query_vector: Precomputed embedding of the question
 
     Returns:
         Answer string
@@ -239,7 +480,7 @@ def query_multimodal(vectorstore: FAISS, query: str, k: int = 4) -> str:
     print("🔍 Searching documents...")
 
     # Retrieve relevant documents
-    docs = vectorstore.similarity_search(query, k=k)
+    docs = retrieve(vectorstore, query, k, query_vector)
 
     # Separate text and image contexts
     text_contexts = []
@@ -261,10 +502,7 @@ def query_multimodal(vectorstore: FAISS, query: str, k: int = 4) -> str:
 
     # Build multimodal prompt
     messages = [
-        {
-            "role": "system",
-            "content": "You are a helpful assistant analyzing documents. Answer questions based on the provided text and image descriptions. Be specific and reference the sources."
-        },
+        _QA_SYSTEM_MESSAGE,
         {
             "role": "user",
             "content": []
@@ -290,21 +528,53 @@ def query_multimodal(vectorstore: FAISS, query: str, k: int = 4) -> str:
         })
 
         # Add actual image for vision model to see
-        if doc.metadata.get('image_uri'):
+        if doc.metadata.get('image_url'):
+            try:
+                image_uri = fetch_image_data_uri(doc.metadata['image_url'])
+            except requests.HTTPError:
+                # Results of a cached index may have expired on the server
+                continue
             messages[1]["content"].append({
                 "type": "image_url",
-                "image_url": {"url": doc.metadata['image_uri']}
+                "image_url": {"url": image_uri}
             })
 
     # Generate answer with vision model
     print("\n🤖 Generating answer with vision model...")
-    llm = ChatOpenAI(model="gpt-4o", temperature=0)
+    llm = get_chat_model(VISION_MODEL)
     response = llm.invoke(messages)
 
     print(f"\n💡 Answer:\n{response.content}")
     return response.content
 
 
+def query_multimodal_batch(vectorstore: FAISS, queries: List[str], k: int = 4) -> List[str]:
+    """Answer several questions, embedding them all in one request"""
+    query_vectors = get_embeddings().underlying_embeddings.embed_documents(queries)
+    return [
+        query_multimodal(vectorstore, query, k, query_vector)
+        for query, query_vector in zip(queries, query_vectors)
+    ]
+
+
+def read_questions(prompt: str) -> List[str]:
+    """
+    Read a question, plus any further lines pasted along with it
+
+    On POSIX terminals, lines that arrive within PASTE_WINDOW seconds of the
+    first are returned too, so several pasted questions are handled as a batch.
+    """
+    lines = [input(prompt)]
+    if os.name == "posix" and sys.stdin.isatty():
+        while select.select([sys.stdin], [], [], PASTE_WINDOW)[0]:
+            line = sys.stdin.readline()
+            if not line:
+                break
+            lines.append(line)
+
+    return [line.strip() for line in lines if line.strip()]
+
+
 def main():
     """Main execution"""
     if len(sys.argv) < 2:
@@ -320,25 +590,32 @@ def main():
         sys.exit(1)
 
     try:
-        # 1. Upload and parse document
-        job_id = upload_document(file_path)
-
-        # 2. Wait for completion
-        result = wait_for_completion(job_id)
+        index_dir = index_cache_dir(file_path)
+        if index_dir.exists():
+            # 1-5. Reuse the vector store built for this file by an earlier run
+            print("♻️  Loading cached vector store...")
+            vectorstore = FAISS.load_local(
+                str(index_dir), get_embeddings(), allow_dangerous_deserialization=True,
+                normalize_L2=True, distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+            )
+        else:
+            # 1-2. Upload document and wait for parsing
+            result = run_async(parse_documents([file_path]))[0]
 
-        # 3. Display statistics
-        stats = result['statistics']
-        print(f"\n📊 Document Statistics:")
-        print(f"   Pages: {result['metadata']['page_count']}")
-        print(f"   Text items: {stats['total_text_items']}")
-        print(f"   Tables: {stats['total_tables']}")
-        print(f"   Images: {stats['total_pictures']}")
+            # 3. Display statistics
+            stats = result['statistics']
+            print(f"\n📊 Document Statistics:")
+            print(f"   Pages: {result['metadata']['page_count']}")
+            print(f"   Text items: {stats['total_text_items']}")
+            print(f"   Tables: {stats['total_tables']}")
+            print(f"   Images: {stats['total_pictures']}")
 
-        # 4. Create multimodal documents with vision enrichment
-        documents = create_multimodal_documents(result)
+            # 4. Create multimodal documents with vision enrichment
+            documents = create_multimodal_documents(result)
 
-        # 5. Build vector store
-        vectorstore = build_vector_store(documents)
+            # 5. Build vector store
+            vectorstore = build_vector_store(documents)
+            vectorstore.save_local(str(index_dir))
 
         # 6. Query with multimodal context
         answer = query_multimodal(vectorstore, query)
@@ -349,13 +626,18 @@ def main():
         print("="*60)
 
         while True:
-            user_query = input("\n❓ Your question: ").strip()
-            if user_query.lower() in ['quit', 'exit', 'q']:
-                break
-            if not user_query:
-                continue
+            questions = read_questions("\n❓ Your question: ")
+
+            # A quit line anywhere in a pasted batch ends the session once the
+            # questions before it are answered; anything after it is dropped
+            quit_at = next((i for i, q in enumerate(questions) if q.lower() in QUIT_WORDS), None)
+            if quit_at is not None:
+                questions = questions[:quit_at]
 
-            query_multimodal(vectorstore, user_query)
+            if questions:
+                query_multimodal_batch(vectorstore, questions)
+            if quit_at is not None:
+                break
 
         print("\n👋 Goodbye!")
 
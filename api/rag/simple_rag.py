@@ -2,29 +2,132 @@
 Simple Text-Only RAG Pipeline
 Demonstrates basic document parsing and question answering without images
 """
+import os
 import sys
-import time
-import requests
+import select
+import asyncio
+import hashlib
+from functools import lru_cache
+import httpx
+import faiss
+import numpy as np
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain_community.cross_encoders import HuggingFaceCrossEncoder
 from langchain.chains import RetrievalQA
+from langchain.retrievers import ContextualCompressionRetriever
+from langchain.retrievers.document_compressors import CrossEncoderReranker
+
+
+# uvloop's libuv event loop cuts per-request overhead when many uploads and
+# long-polls are in flight (no Windows build, so fall back to asyncio)
+try:
+    import uvloop
+    run_async = uvloop.run
+except ImportError:
+    run_async = asyncio.run
 
 
 # Configuration
 API_BASE_URL = "http://localhost:8000"
 PARSING_MODE = "standard"
+CHAT_MODEL = "gpt-4o-mini"
+CHUNK_SIZE = 1000  # Characters per chunk
+CHUNK_OVERLAP = 200  # Overlap between chunks
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = 512  # Texts per embeddings request
+IVF_MIN_VECTORS = 10_000  # Below this, exact search is fast enough (and exact)
+IVF_NPROBE = 8  # Clusters searched per query in the IVF index
+RERANKER_MODEL = "BAAI/bge-reranker-base"
+RERANK_CANDIDATES = 20  # Chunks retrieved for the cross-encoder to rerank
+API_TIMEOUT = 60.0  # Seconds per request (covers uploads and long-polls)
+STATUS_WAIT_TIMEOUT = 30  # Seconds the server holds each status request
+PASTE_WINDOW = 0.05  # Seconds to wait for more pasted questions in interactive mode
+QUIT_WORDS = {'quit', 'exit', 'q'}  # Lines that end interactive mode
+MAX_CONCURRENT_DOCUMENTS = 4  # Documents parsed at once by parse_documents
+
+TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP,
+    length_function=len
+)
+
+# Embeddings, vision descriptions and FAISS indexes from earlier runs
+CACHE_DIR = Path(__file__).parent / "cache"
+
+
+@lru_cache(maxsize=8)
+def get_chat_model(model: str) -> ChatOpenAI:
+    """Shared chat client per model, so its HTTP connection pool stays warm across calls"""
+    # Built-in retries back off exponentially on 429s
+    return ChatOpenAI(model=model, temperature=0, max_retries=6)
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Optional[HuggingFaceCrossEncoder]:
+    """Local cross-encoder for reranking retrieved chunks, or None if sentence-transformers isn't installed"""
+    try:
+        return HuggingFaceCrossEncoder(model_name=RERANKER_MODEL)
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> CacheBackedEmbeddings:
+    """OpenAI embeddings cached on disk by chunk text, so each chunk is embedded once"""
+    return CacheBackedEmbeddings.from_bytes_store(
+        OpenAIEmbeddings(model=EMBEDDING_MODEL, chunk_size=EMBEDDING_BATCH_SIZE, max_retries=6),
+        LocalFileStore(str(CACHE_DIR / "embeddings")),
+        namespace=EMBEDDING_MODEL
+    )
+
 
+def index_cache_dir(file_path: str) -> Path:
+    """Cache location of a document's FAISS index, keyed by path, mtime and parsing mode"""
+    path = Path(file_path).resolve()
+    key = f"{path}|{path.stat().st_mtime_ns}|{PARSING_MODE}"
+    return CACHE_DIR / "faiss" / hashlib.sha256(key.encode("utf-8")).hexdigest()
 
-def upload_document(file_path: str) -> str:
+
+def build_faiss_index(vectors: List[List[float]]) -> faiss.Index:
+    """
+    Build a cosine-similarity FAISS index from embedding vectors
+
+    Vectors go in as one contiguous float32 array. Small corpora use exact
+    search; large ones an inverted-file index that probes only the nearest
+    IVF_NPROBE of ~sqrt(N) clusters per query.
+    """
+    arr = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(arr)
+    dim = arr.shape[1]
+
+    if len(arr) < IVF_MIN_VECTORS:
+        index = faiss.IndexFlatIP(dim)
+    else:
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, int(np.sqrt(len(arr))), faiss.METRIC_INNER_PRODUCT)
+        index.train(arr)
+        index.nprobe = IVF_NPROBE
+
+    index.add(arr)
+    return index
+
+
+async def upload_document(client: httpx.AsyncClient, file_path: str) -> str:
     """
     Upload document to Docling Parser API
 
     Args:
+        client: HTTP client for the API
         file_path: Path to document file
 
     Returns:
@@ -32,17 +135,17 @@ def upload_document(file_path: str) -> str:
     """
     print(f"📤 Uploading document: {Path(file_path).name}")
 
-    url = f"{API_BASE_URL}/api/v1/parse/document"
-
+    # httpx streams the file from disk in chunks instead of building the whole
+    # multipart body in memory like requests does
     with open(file_path, 'rb') as f:
-        files = {'file': f}
+        files = {'file': (Path(file_path).name, f)}
         params = {
             'parsing_mode': PARSING_MODE,
             'extract_images': False,  # Text-only for simple RAG
             'extract_tables': True
         }
 
-        response = requests.post(url, files=files, params=params)
+        response = await client.post("/api/v1/parse/document", files=files, params=params)
         response.raise_for_status()
 
     result = response.json()
@@ -50,24 +153,33 @@ def upload_document(file_path: str) -> str:
     return result['job_id']
 
 
-def wait_for_completion(job_id: str, poll_interval: int = 2) -> Dict[str, Any]:
+async def wait_for_completion(client: httpx.AsyncClient, job_id: str) -> Dict[str, Any]:
     """
-    Poll job status until completion
+    Wait for job completion
+
+    Uses long-polling: the server holds each request until the job's
+    status changes, so completion is seen immediately without busy polling.
 
     Args:
+        client: HTTP client for the API
         job_id: Job identifier
-        poll_interval: Seconds between polls
 
     Returns:
         Complete parsing result
     """
-    status_url = f"{API_BASE_URL}/api/v1/parse/jobs/{job_id}"
+    status_url = f"/api/v1/parse/jobs/{job_id}"
+    params = {'wait': 'true', 'timeout': STATUS_WAIT_TIMEOUT}
 
     print("⏳ Waiting for document processing...")
 
+    etag = None
     while True:
-        response = requests.get(status_url)
+        response = await client.get(status_url, params=params, headers={'If-None-Match': etag} if etag else {})
+        if response.status_code == 304:
+            continue  # Unchanged within the wait timeout
         response.raise_for_status()
+
+        etag = response.headers.get('ETag')
         status = response.json()
 
         print(f"   Status: {status['status']} - Progress: {status.get('progress_percent', 0)}%")
@@ -78,16 +190,37 @@ def wait_for_completion(job_id: str, poll_interval: int = 2) -> Dict[str, Any]:
         elif status['status'] == 'failed':
             raise Exception(f"Processing failed: {status.get('error_message')}")
 
-        time.sleep(poll_interval)
-
     # Get full results
-    results_url = f"{API_BASE_URL}/api/v1/parse/results/{job_id}"
-    response = requests.get(results_url)
+    response = await client.get(f"/api/v1/parse/results/{job_id}")
     response.raise_for_status()
 
     return response.json()
 
 
+async def parse_documents(file_paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Upload and parse several documents concurrently
+
+    While the server parses one document, others upload and wait on the
+    same event loop; at most MAX_CONCURRENT_DOCUMENTS are in flight.
+
+    Args:
+        file_paths: Paths to document files
+
+    Returns:
+        Parsing results, in the order of file_paths
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOCUMENTS)
+
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=httpx.Timeout(API_TIMEOUT)) as client:
+        async def parse(file_path: str) -> Dict[str, Any]:
+            async with semaphore:
+                job_id = await upload_document(client, file_path)
+                return await wait_for_completion(client, job_id)
+
+        return await asyncio.gather(*(parse(file_path) for file_path in file_paths))
+
+
 def create_documents(parse_result: Dict[str, Any]) -> List[Document]:
     """
     Convert parse results to LangChain documents
@@ -137,6 +270,17 @@ def create_documents(parse_result: Dict[str, Any]) -> List[Document]:
     return documents
 
 
+def split_documents(documents: List[Document]) -> List[Document]:
+    """Split documents longer than CHUNK_SIZE; the API's paragraph-level items mostly fit as-is"""
+    split_docs = []
+    for doc in documents:
+        if len(doc.page_content) <= CHUNK_SIZE:
+            split_docs.append(doc)
+        else:
+            split_docs.extend(TEXT_SPLITTER.split_documents([doc]))
+    return split_docs
+
+
 def build_vector_store(documents: List[Document]) -> FAISS:
     """
     Build FAISS vector store from documents
@@ -149,24 +293,58 @@ def build_vector_store(documents: List[Document]) -> FAISS:
     """
     print("🔧 Building vector store...")
 
-    # Split large documents into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len
-    )
-
-    split_docs = text_splitter.split_documents(documents)
+    split_docs = split_documents(documents)
     print(f"   Split into {len(split_docs)} chunks")
 
-    # Create embeddings and vector store
-    embeddings = OpenAIEmbeddings()
-    vectorstore = FAISS.from_documents(split_docs, embeddings)
+    # Embed all chunks up front in large batched requests (cached chunks are
+    # skipped), then index the vectors
+    embeddings = get_embeddings()
+    vectors = embeddings.embed_documents([doc.page_content for doc in split_docs])
+    vectorstore = FAISS(
+        embedding_function=embeddings,
+        index=build_faiss_index(vectors),
+        docstore=InMemoryDocstore({str(i): doc for i, doc in enumerate(split_docs)}),
+        index_to_docstore_id={i: str(i) for i in range(len(split_docs))},
+        normalize_L2=True,  # Queries are normalized too, so inner product = cosine
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+    )
 
     print("✅ Vector store created")
     return vectorstore
 
 
+def build_qa_chain(vectorstore: FAISS) -> RetrievalQA:
+    """Build the retrieval QA chain over a vector store"""
+    # With a reranker, retrieve a wider candidate set and keep only the best
+    # few for the LLM prompt
+    reranker = get_reranker()
+    retriever = vectorstore.as_retriever(search_kwargs={"k": RERANK_CANDIDATES if reranker else 3})
+    if reranker is not None:
+        retriever = ContextualCompressionRetriever(
+            base_compressor=CrossEncoderReranker(model=reranker, top_n=3),
+            base_retriever=retriever
+        )
+
+    return RetrievalQA.from_chain_type(
+        llm=get_chat_model(CHAT_MODEL),
+        chain_type="stuff",
+        retriever=retriever,
+        return_source_documents=True
+    )
+
+
+def show_answer(result: Dict[str, Any]) -> str:
+    """Print the sources and answer of a QA chain result"""
+    # Display sources
+    print("\n📚 Retrieved Context:")
+    for i, doc in enumerate(result['source_documents'], 1):
+        print(f"{i}. [{doc.metadata.get('label', doc.metadata.get('type', 'text'))}] Page {doc.metadata.get('page', '?')}")
+        print(f"   {doc.page_content[:150]}...")
+
+    print(f"\n💡 Answer:\n{result['result']}")
+    return result['result']
+
+
 def query_documents(vectorstore: FAISS, query: str) -> str:
     """
     Query documents using RAG
@@ -181,26 +359,43 @@ def query_documents(vectorstore: FAISS, query: str) -> str:
     print(f"\n❓ Query: {query}")
     print("🔍 Searching documents...")
 
-    # Create QA chain
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=vectorstore.as_retriever(search_kwargs={"k": 3}),
-        return_source_documents=True
-    )
+    result = build_qa_chain(vectorstore).invoke({"query": query})
+    return show_answer(result)
 
-    # Query
-    result = qa_chain.invoke({"query": query})
 
-    # Display sources
-    print("\n📚 Retrieved Context:")
-    for i, doc in enumerate(result['source_documents'], 1):
-        print(f"{i}. [{doc.metadata['label']}] Page {doc.metadata.get('page', '?')}")
-        print(f"   {doc.page_content[:150]}...")
+def query_documents_batch(vectorstore: FAISS, queries: List[str]) -> List[str]:
+    """
+    Answer several questions at once
 
-    print(f"\n💡 Answer:\n{result['result']}")
-    return result['result']
+    The chain runs the questions concurrently, so their embedding, retrieval
+    and LLM round-trips overlap instead of queueing one after another.
+    """
+    print(f"🔍 Searching documents for {len(queries)} question(s)...")
+    results = build_qa_chain(vectorstore).batch([{"query": query} for query in queries])
+
+    answers = []
+    for query, result in zip(queries, results):
+        print(f"\n❓ Query: {query}")
+        answers.append(show_answer(result))
+    return answers
+
+
+def read_questions(prompt: str) -> List[str]:
+    """
+    Read a question, plus any further lines pasted along with it
+
+    On POSIX terminals, lines that arrive within PASTE_WINDOW seconds of the
+    first are returned too, so several pasted questions are handled as a batch.
+    """
+    lines = [input(prompt)]
+    if os.name == "posix" and sys.stdin.isatty():
+        while select.select([sys.stdin], [], [], PASTE_WINDOW)[0]:
+            line = sys.stdin.readline()
+            if not line:
+                break
+            lines.append(line)
+
+    return [line.strip() for line in lines if line.strip()]
 
 
 def main():
@@ -218,24 +413,31 @@ def main():
         sys.exit(1)
 
     try:
-        # 1. Upload and parse document
-        job_id = upload_document(file_path)
-
-        # 2. Wait for completion
-        result = wait_for_completion(job_id)
-
-        # 3. Display statistics
-        stats = result['statistics']
-        print(f"\n📊 Document Statistics:")
-        print(f"   Pages: {result['metadata']['page_count']}")
-        print(f"   Text items: {stats['total_text_items']}")
-        print(f"   Tables: {stats['total_tables']}")
-
-        # 4. Create documents
-        documents = create_documents(result)
-
-        # 5. Build vector store
-        vectorstore = build_vector_store(documents)
+        index_dir = index_cache_dir(file_path)
+        if index_dir.exists():
+            # 1-5. Reuse the vector store built for this file by an earlier run
+            print("♻️  Loading cached vector store...")
+            vectorstore = FAISS.load_local(
+                str(index_dir), get_embeddings(), allow_dangerous_deserialization=True,
+                normalize_L2=True, distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+            )
+        else:
+            # 1-2. Upload document and wait for parsing
+            result = run_async(parse_documents([file_path]))[0]
+
+            # 3. Display statistics
+            stats = result['statistics']
+            print(f"\n📊 Document Statistics:")
+            print(f"   Pages: {result['metadata']['page_count']}")
+            print(f"   Text items: {stats['total_text_items']}")
+            print(f"   Tables: {stats['total_tables']}")
+
+            # 4. Create documents
+            documents = create_documents(result)
+
+            # 5. Build vector store
+            vectorstore = build_vector_store(documents)
+            vectorstore.save_local(str(index_dir))
 
         # 6. Query
         answer = query_documents(vectorstore, query)
@@ -246,13 +448,18 @@ def main():
         print("="*60)
 
         while True:
-            user_query = input("\n❓ Your question: ").strip()
-            if user_query.lower() in ['quit', 'exit', 'q']:
-                break
-            if not user_query:
-                continue
+            questions = read_questions("\n❓ Your question: ")
 
-            query_documents(vectorstore, user_query)
+            # A quit line anywhere in a pasted batch ends the session once the
+            # questions before it are answered; anything after it is dropped
+            quit_at = next((i for i, q in enumerate(questions) if q.lower() in QUIT_WORDS), None)
+            if quit_at is not None:
+                questions = questions[:quit_at]
+
+            if questions:
+                query_documents_batch(vectorstore, questions)
+            if quit_at is not None:
+                break
 
         print("\n👋 Goodbye!")
 
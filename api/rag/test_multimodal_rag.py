@@ -0,0 +1,27 @@
+"""
+Unit tests for the multimodal RAG image enrichment
+"""
+import pytest
+
+# The pipeline module pulls in the full RAG stack at import time
+for module in ("faiss", "httpx", "langchain", "langchain_community", "langchain_openai"):
+    pytest.importorskip(module)
+
+import multimodal_rag
+
+
+def test_enrich_image_with_null_caption(monkeypatch):
+    """Pictures the API returns with "caption": null are still described"""
+    monkeypatch.setattr(multimodal_rag, "fetch_image_data_uri", lambda url: "data:image/png;base64,AAAA")
+    monkeypatch.setattr(multimodal_rag, "describe_image", lambda uri, llm: "A bar chart of sales")
+
+    image = {"caption": None, "image_url": "/api/v1/parse/results/abc/image/0"}
+
+    assert multimodal_rag.enrich_image_with_vision(image, llm_vision=None) == "A bar chart of sales"
+
+
+def test_enrich_image_with_null_caption_and_no_image():
+    """A picture with neither caption nor image data gets the placeholder text"""
+    image = {"caption": None, "image_url": None}
+
+    assert multimodal_rag.enrich_image_with_vision(image, llm_vision=None) == "Image without data"
@@ -3,124 +3,721 @@ Job storage and management
 Handles in-memory storage of jobs and results with TTL
 """
 import time
+import asyncio
+import heapq
+import hashlib
+import sqlite3
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
-from threading import Lock
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field, replace
+from enum import Enum
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
+from threading import Event, Lock, Thread
+
+import orjson
+
 from models import JobStatus
 from config import settings
+from utils import cleanup_job_output
+
+
+def _index_texts(texts: List[Dict[str, Any]]) -> Tuple[Dict[Any, List[int]], Dict[str, List[int]]]:
+    """Build page -> indices and label -> indices lookups for text items"""
+    by_page: Dict[Any, List[int]] = defaultdict(list)
+    by_label: Dict[str, List[int]] = defaultdict(list)
+
+    for i, text in enumerate(texts):
+        by_page[text.get("page")].append(i)
+        label = text.get("label")
+        # Labels may be str enums, whose hash differs from their value's
+        by_label[label.value if isinstance(label, Enum) else label].append(i)
+
+    return dict(by_page), dict(by_label)
+
+
+def _encode(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _join_object(members: Dict[str, bytes]) -> bytes:
+    """Assemble a JSON object from already-encoded member values"""
+    return b"{" + b",".join(_encode(name) + b":" + value for name, value in members.items()) + b"}"
+
+
+def result_json(result: Dict[str, Any], fields: Optional[List[str]] = None) -> bytes:
+    """
+    JSON for a stored result
+
+    Args:
+        result: Stored result (from get_result)
+        fields: Top-level fields to include (all if None)
+
+    Returns:
+        Encoded JSON object
+    """
+    encoded = result["_fields"]
+    return _join_object({
+        name: _join_object(result["_sections"]) if name == "content" else encoded[name]
+        for name in (fields or encoded)
+    })
+
+
+def texts_json(result: Dict[str, Any], page: Optional[int] = None,
+               label: Optional[str] = None) -> bytes:
+    """
+    JSON for a TextsResponse, assembled from the text items encoded at store time
+
+    Args:
+        result: Stored result (from get_result)
+        page: Only include texts on this page
+        label: Only include texts with this label
+
+    Returns:
+        Encoded JSON object
+    """
+    items = result["_text_items"]
+    if page is None and label is None:
+        texts, count = result["_sections"]["texts"], len(items)
+    else:
+        # Intersect the page/label indexes built when the result was stored
+        indices = None
+        if page is not None:
+            indices = set(result["_texts_by_page"].get(page, ()))
+        if label is not None:
+            label_indices = set(result["_texts_by_label"].get(label, ()))
+            indices = label_indices if indices is None else indices & label_indices
+
+        texts = b"[" + b",".join(items[i] for i in sorted(indices)) + b"]"
+        count = len(indices)
+
+    return _join_object({
+        "texts": texts,
+        "count": _encode(count),
+        "page_filter": _encode(page),
+        "label_filter": _encode(label),
+    })
+
+
+def tables_json(result: Dict[str, Any], csv: bool = False) -> bytes:
+    """
+    JSON for a TablesResponse, assembled from the tables encoded at store time
+
+    Args:
+        result: Stored result (from get_result)
+        csv: Return only id, page and CSV data for each table
+
+    Returns:
+        Encoded JSON object
+    """
+    return _join_object({
+        "tables": result["_tables_csv"] if csv else result["_sections"]["tables"],
+        "count": _encode(result["_table_count"]),
+        "format": b'"csv"' if csv else b'"dict"',
+    })
+
+
+def images_json(result: Dict[str, Any]) -> bytes:
+    """JSON for an ImagesResponse, assembled from the pictures encoded at store time"""
+    return _join_object({
+        "images": result["_sections"]["pictures"],
+        "count": _encode(result["_picture_count"]),
+    })
+
+
+@dataclass(slots=True)
+class Job:
+    """Parsing job record"""
+    job_id: str
+    status: JobStatus
+    filename: str
+    file_path: str
+    parsing_mode: str
+    options: Dict[str, Any]
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+    progress_percent: int = 0
+    # Internal: identifies uploads that would parse identically (not part of API responses)
+    content_key: Optional[str] = field(default=None, repr=False)
+
+
+def public_job(job: Job) -> Dict[str, Any]:
+    """Job record as returned by the API, without internal bookkeeping fields"""
+    data = asdict(job)
+    del data["content_key"]
+    return data
 
 
 class JobStorage:
     """
     In-memory job storage with TTL management
 
-    For production, replace with Redis or database
+    Completed results can be written through to a ResultStore; they then
+    survive restarts and only the most recently used ones stay in memory.
     """
 
-    def __init__(self):
-        self._jobs: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, result_store: Optional["ResultStore"] = None):
+        self._result_store = result_store
+        self._jobs: Dict[str, Job] = {}
         self._results: Dict[str, Dict[str, Any]] = {}
-        self._lock = Lock()
+        # Min-heap of (monotonic expiry, job_id); entries for deleted or re-stored
+        # results are skipped when popped
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # status -> job IDs (dict used as an insertion-ordered set)
+        self._by_status: Dict[JobStatus, Dict[str, None]] = {status: {} for status in JobStatus}
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(list)
+        # content key -> most recent job created for it
+        self._by_content: Dict[str, str] = {}
+        # Separate locks so status polling and progress updates never wait
+        # behind result storage, lookups or expiry sweeps (and vice versa)
+        self._jobs_lock = Lock()  # _jobs, _by_status, _by_content, _subscribers
+        self._results_lock = Lock()  # _results, _expiry_heap, _persisted
+        # job_id -> Unix expiry of every result in the result store, so lookups
+        # of unknown IDs are answered without touching the database
+        self._persisted: Dict[str, float] = {}
+
+        # Expired results are dropped by a background thread that sleeps until
+        # the earliest expiry, keeping cleanup off the request path
+        self._cleanup_wakeup = Event()
+        self._cleanup_stop = Event()
+        if result_store is not None:
+            # Schedule expiry of results persisted by earlier runs
+            now_wall, now_monotonic = time.time(), time.monotonic()
+            self._persisted = dict(result_store.expiries())
+            self._expiry_heap = [
+                (now_monotonic + expires_at - now_wall, job_id)
+                for job_id, expires_at in self._persisted.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+        self._cleanup_thread = Thread(target=self._cleanup_loop, name="result-cleanup", daemon=True)
+        self._cleanup_thread.start()
 
     def create_job(self, job_id: str, filename: str, file_path: str,
-                   parsing_mode: str, options: Dict[str, Any]) -> Dict[str, Any]:
+                   parsing_mode: str, options: Dict[str, Any],
+                   content_key: Optional[str] = None) -> Job:
         """Create a new parsing job"""
-        with self._lock:
-            job_data = {
-                "job_id": job_id,
-                "status": JobStatus.PENDING,
-                "filename": filename,
-                "file_path": file_path,
-                "parsing_mode": parsing_mode,
-                "options": options,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
-                "completed_at": None,
-                "error_message": None,
-                "progress_percent": 0
-            }
+        now = datetime.utcnow()
+        with self._jobs_lock:
+            job_data = Job(
+                job_id=job_id,
+                status=JobStatus.PENDING,
+                filename=filename,
+                file_path=file_path,
+                parsing_mode=parsing_mode,
+                options=options,
+                created_at=now,
+                updated_at=now,
+                content_key=content_key
+            )
             self._jobs[job_id] = job_data
+            self._by_status[JobStatus.PENDING][job_id] = None
+            if content_key is not None:
+                self._by_content[content_key] = job_id
             return job_data
 
-    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+    def find_job_by_content(self, content_key: str) -> Optional[Job]:
+        """Find a pending, processing or completed (with live results) job for a content key"""
+        with self._jobs_lock:
+            job_id = self._by_content.get(content_key)
+            job = self._jobs.get(job_id) if job_id is not None else None
+
+        if job is None or job.status == JobStatus.FAILED:
+            return None
+        if job.status == JobStatus.COMPLETED and not self._has_result(job.job_id):
+            return None
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
         """Get job by ID"""
-        with self._lock:
-            return self._jobs.get(job_id)
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+        return job if job is not None else self._load_job(job_id)
+
+    async def get_job_async(self, job_id: str) -> Optional[Job]:
+        """get_job for the event loop: a job restored from disk is read in a worker thread"""
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+        if job is not None or not self._is_persisted(job_id):
+            return job
+        return await asyncio.to_thread(self._load_job, job_id)
 
     def update_job_status(self, job_id: str, status: JobStatus,
                          progress_percent: Optional[int] = None,
                          error_message: Optional[str] = None):
-        """Update job status"""
-        with self._lock:
+        """Update job status and notify subscribers"""
+        now = datetime.utcnow()
+        with self._jobs_lock:
             if job_id not in self._jobs:
                 return
 
-            self._jobs[job_id]["status"] = status
-            self._jobs[job_id]["updated_at"] = datetime.utcnow()
+            job = self._jobs[job_id]
+            if job.status != status:
+                self._by_status[job.status].pop(job_id, None)
+                self._by_status[status][job_id] = None
+
+            job.status = status
+            job.updated_at = now
 
             if progress_percent is not None:
-                self._jobs[job_id]["progress_percent"] = progress_percent
+                job.progress_percent = progress_percent
 
             if error_message is not None:
-                self._jobs[job_id]["error_message"] = error_message
+                job.error_message = error_message
 
             if status == JobStatus.COMPLETED or status == JobStatus.FAILED:
-                self._jobs[job_id]["completed_at"] = datetime.utcnow()
+                job.completed_at = now
+
+            snapshot = replace(job)
+            subscribers = list(self._subscribers.get(job_id, ()))
+
+        # Called from worker threads, so hand updates to each subscriber's loop
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, snapshot)
+            except RuntimeError:
+                # Subscriber's event loop already closed
+                pass
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Job]:
+        """
+        Yield the current job state, then each update until the job finishes
+
+        Yields nothing if the job doesn't exist.
+        """
+        # Falls back to a persisted job after a restart, like get_job
+        job = await self.get_job_async(job_id)
+        if job is None:
+            return
+        if job.status in (JobStatus.COMPLETED, JobStatus.FAILED):
+            # Finished jobs won't change again, so there's nothing to wait for
+            yield replace(job)
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            snapshot = replace(job)
+            self._subscribers[job_id].append(subscriber)
+
+        try:
+            yield snapshot
+            while snapshot.status not in (JobStatus.COMPLETED, JobStatus.FAILED):
+                snapshot = await queue.get()
+                yield snapshot
+        finally:
+            with self._jobs_lock:
+                subscribers = self._subscribers.get(job_id)
+                if subscribers is not None:
+                    subscribers.remove(subscriber)
+                    if not subscribers:
+                        del self._subscribers[job_id]
+
+    @staticmethod
+    def _build_result(result_data: Dict[str, Any], expires_monotonic: float) -> Dict[str, Any]:
+        """Encode a result into the stored layout (see store_result)"""
+        content = result_data["content"]
+
+        result = {
+            "_fields": {
+                name: None if name == "content" else _encode(value)
+                for name, value in result_data.items()
+            },
+            "_sections": {name: _encode(value) for name, value in content.items()},
+            # TTL checks use the monotonic clock, immune to wall-clock adjustments
+            "_expires_monotonic": expires_monotonic,
+            "_markdown_bytes": content["markdown"].encode("utf-8"),
+        }
+        result["_etag"] = '"%s"' % hashlib.blake2b(result_json(result), digest_size=16).hexdigest()
+
+        # Index text items by filter value so filtered lookups skip a full scan,
+        # and keep each item encoded so filtered responses are joined from bytes
+        result["_texts_by_page"], result["_texts_by_label"] = _index_texts(content["texts"])
+        result["_text_items"] = [_encode(text) for text in content["texts"]]
+
+        # Tables are also served in a CSV-only projection
+        result["_tables_csv"] = _encode([
+            {"id": table["id"], "page": table.get("page"), "csv": table.get("dataframe_csv", "")}
+            for table in content["tables"]
+        ])
+        result["_table_count"] = len(content["tables"])
+        result["_picture_count"] = len(content["pictures"])
+
+        return result
 
     def store_result(self, job_id: str, result_data: Dict[str, Any]):
-        """Store parsing result"""
-        with self._lock:
-            result_data["stored_at"] = datetime.utcnow()
-            result_data["expires_at"] = datetime.utcnow() + timedelta(
-                seconds=settings.RESULTS_TTL_SECONDS
-            )
-            self._results[job_id] = result_data
+        """
+        Store parsing result
+
+        The result is kept as encoded JSON rather than a Python object graph,
+        which takes roughly half the memory. Each top-level field and content
+        section is encoded separately, so responses are assembled from the
+        bytes and only the sections a request filters are decoded.
+
+        With a result store configured the result is also written to disk, so
+        it survives restarts and can be evicted from memory.
+        """
+        ttl = settings.RESULTS_TTL_SECONDS
+        result_data["stored_at"] = datetime.utcnow()
+        result_data["expires_at"] = result_data["stored_at"] + timedelta(seconds=ttl)
+
+        result = self._build_result(result_data, time.monotonic() + ttl)
+
+        if self._result_store is not None:
+            job = self.get_job(job_id)
+            if job is not None:
+                expires_at = time.time() + ttl
+                self._result_store.put(job, result_json(result), expires_at)
+                with self._results_lock:
+                    self._persisted[job_id] = expires_at
+
+        self._insert_result(job_id, result)
+
+    def _insert_result(self, job_id: str, result: Dict[str, Any]):
+        """Add a built result to memory and schedule its expiry"""
+        with self._results_lock:
+            self._results.pop(job_id, None)
+            self._results[job_id] = result
+            heapq.heappush(self._expiry_heap, (result["_expires_monotonic"], job_id))
+            new_earliest = self._expiry_heap[0][1] == job_id
+
+            # Persisted results can be dropped from memory and reloaded on demand
+            if self._result_store is not None:
+                while len(self._results) > settings.RESULTS_MEMORY_MAX_ENTRIES:
+                    del self._results[next(iter(self._results))]
+
+        if new_earliest:
+            # Cleanup thread is sleeping until a later expiry (or indefinitely)
+            self._cleanup_wakeup.set()
+
+    def _is_persisted(self, job_id: str) -> bool:
+        """Whether the result store holds an unexpired result for a job"""
+        with self._results_lock:
+            expires_at = self._persisted.get(job_id)
+        return expires_at is not None and expires_at > time.time()
+
+    def _has_result(self, job_id: str) -> bool:
+        """Whether a job has a live result in memory or on disk (without loading it)"""
+        with self._results_lock:
+            if self._get_live_result(job_id) is not None:
+                return True
+        return self._is_persisted(job_id)
+
+    def _load_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Reload a persisted result into memory (None if missing or expired)"""
+        if self._result_store is None or not self._is_persisted(job_id):
+            return None
+
+        stored = self._result_store.get(job_id)
+        if stored is None:
+            return None
+
+        _, result_bytes, expires_at = stored
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            return None
+
+        result = self._build_result(orjson.loads(result_bytes), time.monotonic() + remaining)
+        self._insert_result(job_id, result)
+        return result
+
+    def _load_job(self, job_id: str) -> Optional[Job]:
+        """Restore the record of a job whose result was persisted (None if unknown)"""
+        if self._result_store is None or not self._is_persisted(job_id):
+            return None
+
+        stored = self._result_store.get_job(job_id)
+        if stored is None or stored[1] <= time.time():
+            return None
+
+        job = stored[0]
+        with self._jobs_lock:
+            existing = self._jobs.get(job_id)
+            if existing is not None:
+                return existing
+            self._jobs[job_id] = job
+            self._by_status[job.status][job_id] = None
+            if job.content_key is not None:
+                self._by_content.setdefault(job.content_key, job_id)
+        return job
+
+    def _get_live_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get result if not expired (caller must hold the results lock)"""
+        result = self._results.get(job_id)
+        if result is None:
+            return None
+
+        # Check if expired - leave the removal (and its rmtree) to the
+        # cleanup thread so request handlers never touch the disk here
+        if time.monotonic() > result["_expires_monotonic"]:
+            self._cleanup_wakeup.set()
+            return None
+
+        if self._result_store is not None:
+            # Keep recently used results at the end of the eviction order
+            self._results[job_id] = self._results.pop(job_id)
+
+        return result
 
     def get_result(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get parsing result if not expired"""
-        with self._lock:
-            if job_id not in self._results:
-                return None
+        with self._results_lock:
+            result = self._get_live_result(job_id)
+            if result is not None or job_id in self._results:
+                return result
 
-            result = self._results[job_id]
+        return self._load_result(job_id)
 
-            # Check if expired
-            if datetime.utcnow() > result["expires_at"]:
-                del self._results[job_id]
-                return None
+    async def get_result_async(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        get_result for the event loop: reloading a persisted result (a
+        database read plus re-encoding every section) runs in a worker thread
+        """
+        with self._results_lock:
+            result = self._get_live_result(job_id)
+            if result is not None or job_id in self._results:
+                return result
+
+        if not self._is_persisted(job_id):
+            return None
+        return await asyncio.to_thread(self._load_result, job_id)
+
+    def get_job_and_result(self, job_id: str) -> Tuple[Optional[Job], Optional[Dict[str, Any]]]:
+        """Get job and its (non-expired) result"""
+        return self.get_job(job_id), self.get_result(job_id)
 
-            return result
+    async def get_job_and_result_async(self, job_id: str) -> Tuple[Optional[Job], Optional[Dict[str, Any]]]:
+        """get_job_and_result for the event loop"""
+        return await self.get_job_async(job_id), await self.get_result_async(job_id)
 
     def delete_result(self, job_id: str):
         """Delete result"""
-        with self._lock:
+        with self._results_lock:
             if job_id in self._results:
                 del self._results[job_id]
+            self._persisted.pop(job_id, None)
+
+        if self._result_store is not None:
+            self._result_store.delete(job_id)
+
+        cleanup_job_output(job_id)
 
     def cleanup_expired_results(self):
-        """Clean up expired results"""
-        with self._lock:
-            now = datetime.utcnow()
-            expired_ids = [
-                job_id for job_id, result in self._results.items()
-                if now > result["expires_at"]
-            ]
-            for job_id in expired_ids:
-                del self._results[job_id]
+        """Clean up expired results (pops only expired heap entries)"""
+        expired_ids = []
+        with self._results_lock:
+            now = time.monotonic()
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                expires_at, job_id = heapq.heappop(heap)
+                result = self._results.get(job_id)
+                if result is not None and result["_expires_monotonic"] == expires_at:
+                    del self._results[job_id]
+                    expired_ids.append(job_id)
+
+        if self._result_store is not None:
+            # Covers persisted results that were evicted from (or never loaded into) memory
+            expired_ids = set(expired_ids).union(self._result_store.delete_expired(time.time()))
+            with self._results_lock:
+                for job_id in expired_ids:
+                    self._persisted.pop(job_id, None)
+
+        for job_id in expired_ids:
+            cleanup_job_output(job_id)
+
+    def _cleanup_loop(self):
+        """Sleep until the earliest result expires, then drop expired results"""
+        while not self._cleanup_stop.is_set():
+            with self._results_lock:
+                next_expiry = self._expiry_heap[0][0] if self._expiry_heap else None
 
-    def get_all_jobs(self, status: Optional[JobStatus] = None) -> list:
+            timeout = None if next_expiry is None else max(0.0, next_expiry - time.monotonic())
+            self._cleanup_wakeup.wait(timeout)
+            self._cleanup_wakeup.clear()
+
+            try:
+                self.cleanup_expired_results()
+            except Exception as e:
+                print(f"Warning: Result cleanup failed: {e}")
+
+    def shutdown(self):
+        """Stop the cleanup thread"""
+        self._cleanup_stop.set()
+        self._cleanup_wakeup.set()
+        self._cleanup_thread.join(timeout=5)
+
+    def get_all_jobs(self, status: Optional[JobStatus] = None) -> List[Job]:
         """Get all jobs, optionally filtered by status"""
-        with self._lock:
-            jobs = list(self._jobs.values())
+        with self._jobs_lock:
             if status:
-                jobs = [j for j in jobs if j["status"] == status]
-            return jobs
+                return [self._jobs[job_id] for job_id in self._by_status[status]]
+            return list(self._jobs.values())
 
     def count_jobs_by_status(self, status: JobStatus) -> int:
         """Count jobs with specific status"""
+        with self._jobs_lock:
+            return len(self._by_status[status])
+
+    def count_active_jobs(self) -> int:
+        """Count jobs that are pending or processing"""
+        with self._jobs_lock:
+            return (len(self._by_status[JobStatus.PENDING])
+                    + len(self._by_status[JobStatus.PROCESSING]))
+
+
+class DescriptionCache:
+    """
+    Persistent cache of AI image descriptions
+
+    Keyed by image content hash, model and prompt, so re-parsing a document
+    (or another one sharing images) skips the vision model call.
+    """
+
+    def __init__(self, db_path: Path):
+        self._db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use (caller must hold the lock)"""
+        if self._conn is None:
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS descriptions ("
+                "image_hash TEXT NOT NULL, model TEXT NOT NULL, prompt_hash TEXT NOT NULL, "
+                "description TEXT NOT NULL, created_at INTEGER NOT NULL, "
+                "PRIMARY KEY (image_hash, model, prompt_hash))"
+            )
+        return self._conn
+
+    @staticmethod
+    def _prompt_hash(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def get(self, image_hash: str, model: str, prompt: str) -> Optional[str]:
+        """Get a cached description"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT description FROM descriptions WHERE image_hash = ? AND model = ? AND prompt_hash = ?",
+                (image_hash, model, self._prompt_hash(prompt))
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, image_hash: str, model: str, prompt: str, description: str):
+        """Store a description"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO descriptions VALUES (?, ?, ?, ?, ?)",
+                (image_hash, model, self._prompt_hash(prompt), description, int(time.time()))
+            )
+            conn.commit()
+
+
+class ResultStore:
+    """
+    Persistent store of completed results
+
+    Each row holds the job record and the result JSON, so a restarted server
+    (or one that evicted the result from memory) can still serve it until it
+    expires.
+    """
+
+    def __init__(self, db_path: Path):
+        self._db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use (caller must hold the lock)"""
+        if self._conn is None:
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "job_id TEXT PRIMARY KEY, job BLOB NOT NULL, result BLOB NOT NULL, "
+                "expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_expires_at ON results (expires_at)")
+        return self._conn
+
+    def put(self, job: Job, result: bytes, expires_at: float):
+        """Store a completed job's result (expires_at is a Unix timestamp)"""
+        # A stored result means the job completed; record it that way since
+        # the status update follows the store
+        job = replace(job, status=JobStatus.COMPLETED, progress_percent=100,
+                      completed_at=job.completed_at or datetime.utcnow())
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (job.job_id, _encode(job), result, expires_at)
+            )
+            conn.commit()
+
+    @staticmethod
+    def _decode_job(job_bytes: bytes) -> Job:
+        """Rebuild a Job from its stored JSON"""
+        job = orjson.loads(job_bytes)
+        job["status"] = JobStatus(job["status"])
+        for name in ("created_at", "updated_at", "completed_at"):
+            if job[name] is not None:
+                job[name] = datetime.fromisoformat(job[name])
+        return Job(**job)
+
+    def get(self, job_id: str) -> Optional[Tuple[Job, bytes, float]]:
+        """Get (job, result JSON, expires_at) for a stored result"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT job, result, expires_at FROM results WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._decode_job(row[0]), row[1], row[2]
+
+    def get_job(self, job_id: str) -> Optional[Tuple[Job, float]]:
+        """Get (job, expires_at) for a stored result, without reading the result itself"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT job, expires_at FROM results WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._decode_job(row[0]), row[1]
+
+    def delete(self, job_id: str):
+        """Delete a stored result"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM results WHERE job_id = ?", (job_id,))
+            conn.commit()
+
+    def delete_expired(self, now: float) -> List[str]:
+        """Delete results that expired before now, returning their job IDs"""
+        with self._lock:
+            conn = self._connection()
+            job_ids = [row[0] for row in conn.execute(
+                "SELECT job_id FROM results WHERE expires_at <= ?", (now,)
+            )]
+            if job_ids:
+                conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+                conn.commit()
+        return job_ids
+
+    def expiries(self) -> List[Tuple[str, float]]:
+        """(job_id, expires_at) of every stored result"""
         with self._lock:
-            return sum(1 for job in self._jobs.values() if job["status"] == status)
+            return self._connection().execute("SELECT job_id, expires_at FROM results").fetchall()
 
 
-# Global storage instance
-job_storage = JobStorage()
+# Global storage instances
+job_storage = JobStorage(
+    ResultStore(settings.RESULTS_DB_PATH) if settings.RESULTS_PERSIST_ENABLED else None
+)
+description_cache = DescriptionCache(settings.DESCRIPTION_CACHE_PATH)
@@ -1,10 +1,13 @@
 """
 Simple test script to verify API is working
 """
+import json
 import requests
-import time
 import sys
 
+# websockets ships with uvicorn[standard]
+from websockets.sync.client import connect
+
 
 def test_api():
     """Test the API endpoints"""
@@ -73,28 +76,28 @@ def test_api():
         print(f"   ✓ Upload successful!")
         print(f"   Job ID: {job_id}")
 
-        # 4. Check job status
+        # 4. Check job status - the server pushes each change over a WebSocket
         print("\n4. Checking job status...")
-        max_attempts = 30
-        for i in range(max_attempts):
-            response = requests.get(f"{base_url}/api/v1/parse/jobs/{job_id}")
-            status_data = response.json()
-            status = status_data["status"]
-            progress = status_data.get("progress_percent", 0)
-
-            print(f"   Status: {status} ({progress}%)")
-
-            if status == "completed":
-                print("   ✓ Parsing completed!")
-                break
-            elif status == "failed":
-                print(f"   ✗ Parsing failed: {status_data.get('error_message')}")
-                return
-
-            time.sleep(2)
-        else:
-            print("   ⚠ Timeout waiting for results")
-            return
+        ws_url = f"{base_url.replace('http', 'ws', 1)}/api/v1/parse/jobs/{job_id}/ws"
+        with connect(ws_url) as ws:
+            while True:
+                try:
+                    status_data = json.loads(ws.recv(timeout=60))
+                except TimeoutError:
+                    print("   ⚠ Timeout waiting for results")
+                    return
+
+                status = status_data["status"]
+                progress = status_data.get("progress_percent", 0)
+
+                print(f"   Status: {status} ({progress}%)")
+
+                if status == "completed":
+                    print("   ✓ Parsing completed!")
+                    break
+                elif status == "failed":
+                    print(f"   ✗ Parsing failed: {status_data.get('error_message')}")
+                    return
 
         # 5. Get results
         print("\n5. Fetching results...")
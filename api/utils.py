@@ -2,24 +2,78 @@
 Utility functions for file handling and data extraction
 """
 import os
+import re
+import csv
+import asyncio
 import uuid
+import hashlib
+import base64
+import shutil
+import importlib
 import mimetypes
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
+from io import BytesIO, StringIO
+from functools import lru_cache
+from threading import BoundedSemaphore
+
+import aiofiles
+import aiofiles.os
+import orjson
 from fastapi import UploadFile, HTTPException
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+from PIL import Image
 
 from config import settings
 from models import (
-    BoundingBox, TextItem, TableItem, PictureItem,
-    PageInfo, DocumentMetadata, DocumentStatistics
+    BoundingBox, TableItem, PictureItem,
+    DocumentMetadata, DocumentStatistics
 )
 
 
+# Docling embeds generated picture images as PNG data URIs
+_PNG_DATA_URI_RE = re.compile(r'data:image/png;base64,(.+)', re.DOTALL)
+# Any base64 image data URI (e.g. the JPEGs sent to vision models)
+_DATA_URI_RE = re.compile(r'data:(image/\w+);base64,(.+)', re.DOTALL)
+
+
 # ============================================================================
 # FILE HANDLING
 # ============================================================================
 
+# Leading magic bytes of the binary formats we accept
+_FILE_SIGNATURES = (
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+)
+_SIGNATURE_LENGTH = max(len(signature) for signature, _ in _FILE_SIGNATURES)
+
+
+def sniff_content_type(file: UploadFile) -> Optional[str]:
+    """
+    Detect content type from the file's leading bytes
+
+    Args:
+        file: Uploaded file
+
+    Returns:
+        Content type, or None if no known signature matches (e.g. text formats)
+    """
+    head = file.file.read(_SIGNATURE_LENGTH)
+    file.file.seek(0)
+
+    for signature, content_type in _FILE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
 def validate_file(file: UploadFile) -> str:
     """
     Validate uploaded file and return content type
@@ -39,7 +93,7 @@ def validate_file(file: UploadFile) -> str:
 
     # Check file extension
     file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in settings.ALLOWED_EXTENSIONS:
+    if file_ext not in settings.ALLOWED_EXTENSIONS_SET:
         raise HTTPException(
             status_code=400,
             detail={
@@ -49,8 +103,12 @@ def validate_file(file: UploadFile) -> str:
             }
         )
 
-    # Detect content type
-    content_type = file.content_type or mimetypes.guess_type(file.filename)[0]
+    # Detect content type (file signature first, then declared type / extension)
+    content_type = (
+        sniff_content_type(file)
+        or file.content_type
+        or mimetypes.guess_type(file.filename)[0]
+    )
 
     if content_type not in settings.SUPPORTED_MIME_TYPES:
         raise HTTPException(
@@ -65,7 +123,18 @@ def validate_file(file: UploadFile) -> str:
     return content_type
 
 
-async def save_upload_file(file: UploadFile, job_id: str) -> Path:
+def _file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail={
+            "error": "FILE_TOO_LARGE",
+            "message": f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE_MB}MB",
+            "max_size_mb": settings.MAX_FILE_SIZE_MB
+        }
+    )
+
+
+async def save_upload_file(file: UploadFile, job_id: str) -> Tuple[Path, str]:
     """
     Save uploaded file to temporary directory
 
@@ -74,40 +143,49 @@ async def save_upload_file(file: UploadFile, job_id: str) -> Path:
         job_id: Job identifier
 
     Returns:
-        Path to saved file
+        Tuple of (path to saved file, SHA-256 hex digest of its contents)
     """
+    # Starlette already knows the size of a fully received upload - reject
+    # oversized files before copying a single byte
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE_BYTES:
+        raise _file_too_large()
+
     # Create job-specific temp directory
     job_dir = settings.TEMP_DIR / job_id
-    job_dir.mkdir(parents=True, exist_ok=True)
+    await aiofiles.os.makedirs(job_dir, exist_ok=True)
 
     # Generate safe filename
     file_ext = Path(file.filename).suffix
     safe_filename = f"{job_id}{file_ext}"
     file_path = job_dir / safe_filename
 
-    # Save file
+    # Stream file to disk in chunks so memory use doesn't grow with file size.
+    # Written under a .part name and renamed when complete, so a crash
+    # mid-upload never leaves a truncated file at the final path
+    partial_path = file_path.with_name(file_path.name + ".part")
     try:
-        contents = await file.read()
+        total_size = 0
+        # Hashed while streaming so duplicate uploads can reuse earlier jobs
+        digest = hashlib.sha256()
+        async with aiofiles.open(partial_path, "wb") as f:
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE_BYTES):
+                total_size += len(chunk)
 
-        # Check file size
-        if len(contents) > settings.MAX_FILE_SIZE_BYTES:
-            raise HTTPException(
-                status_code=413,
-                detail={
-                    "error": "FILE_TOO_LARGE",
-                    "message": f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE_MB}MB",
-                    "max_size_mb": settings.MAX_FILE_SIZE_MB
-                }
-            )
+                # Check file size
+                if total_size > settings.MAX_FILE_SIZE_BYTES:
+                    raise _file_too_large()
 
-        with open(file_path, "wb") as f:
-            f.write(contents)
+                digest.update(chunk)
+                await f.write(chunk)
 
-        return file_path
+        await aiofiles.os.replace(partial_path, file_path)
+        return file_path, digest.hexdigest()
 
     except HTTPException:
+        await asyncio.to_thread(cleanup_job_files, job_id)
         raise
     except Exception as e:
+        await asyncio.to_thread(cleanup_job_files, job_id)
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
 
 
@@ -120,13 +198,66 @@ def cleanup_job_files(job_id: str):
     """
     job_dir = settings.TEMP_DIR / job_id
     if job_dir.exists():
-        import shutil
         try:
             shutil.rmtree(job_dir)
         except Exception as e:
             print(f"Warning: Failed to cleanup job files for {job_id}: {e}")
 
 
+def job_image_path(job_id: str, image_index: int) -> Path:
+    """
+    Get on-disk path of an extracted image
+
+    Args:
+        job_id: Job identifier
+        image_index: Position of the picture in the result's picture list
+
+    Returns:
+        Path to the PNG file
+    """
+    return settings.OUTPUT_DIR / job_id / f"img_{image_index}.png"
+
+
+def vlm_image_data_uri(image_bytes: bytes) -> str:
+    """
+    Load an extracted image as a base64 data URI for vision model APIs
+
+    Images are shrunk to VLM_IMAGE_MAX_EDGE and re-encoded as JPEG, which
+    cuts upload size and vision token cost several-fold for high-scale renders.
+
+    Args:
+        image_bytes: PNG file contents
+
+    Returns:
+        Data URI (format: data:image/jpeg;base64,...)
+    """
+    max_edge = settings.VLM_IMAGE_MAX_EDGE
+
+    with Image.open(BytesIO(image_bytes)) as image:
+        if max(image.size) > max_edge:
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        buffer = BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=settings.VLM_IMAGE_JPEG_QUALITY)
+
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def cleanup_job_output(job_id: str):
+    """
+    Clean up extracted images for a job
+
+    Args:
+        job_id: Job identifier
+    """
+    output_dir = settings.OUTPUT_DIR / job_id
+    if output_dir.exists():
+        try:
+            shutil.rmtree(output_dir)
+        except Exception as e:
+            print(f"Warning: Failed to cleanup job output for {job_id}: {e}")
+
+
 # ============================================================================
 # DATA EXTRACTION FROM DOCLING DOCUMENT
 # ============================================================================
@@ -180,7 +311,7 @@ def extract_statistics(doc: Any) -> DocumentStatistics:
     return stats
 
 
-def extract_pages(doc: Any) -> List[PageInfo]:
+def extract_pages(doc: Any) -> List[Dict[str, Any]]:
     """
     Extract page information
 
@@ -188,61 +319,114 @@ def extract_pages(doc: Any) -> List[PageInfo]:
         doc: Docling document object
 
     Returns:
-        List of PageInfo objects
+        List of PageInfo dictionaries
     """
-    pages = []
-    if not hasattr(doc, 'pages'):
-        return pages
+    pages = getattr(doc, 'pages', None)
+    if not pages:
+        return []
 
-    for i, page in enumerate(doc.pages, 1):
-        page_info = PageInfo(
-            page_number=i,
-            width=page.size.width if hasattr(page, 'size') else None,
-            height=page.size.height if hasattr(page, 'size') else None
-        )
-        pages.append(page_info)
+    # DoclingDocument keys its pages by page number
+    numbered = pages.items() if isinstance(pages, dict) else enumerate(pages, 1)
+
+    result = []
+    for page_number, page in numbered:
+        size = getattr(page, 'size', None)
+        result.append({
+            "page_number": page_number,
+            "width": size.width if size is not None else None,
+            "height": size.height if size is not None else None,
+            "items_count": None
+        })
+
+    return result
 
-    return pages
 
+def _provenance(item: Any) -> Tuple[Optional[int], Any]:
+    """Page number and raw Docling bounding box from an item's first provenance entry"""
+    prov = getattr(item, 'prov', None)
+    if not prov:
+        return None, None
 
-def extract_texts(doc: Any) -> List[TextItem]:
+    first = prov[0]
+    return first.page_no, getattr(first, 'bbox', None)
+
+
+def extract_texts(doc: Any) -> List[Dict[str, Any]]:
     """
     Extract text items from document
 
+    Items are built as plain dictionaries (TextItem layout) rather than
+    models: they are only ever encoded to JSON, and documents can have tens
+    of thousands of them.
+
     Args:
         doc: Docling document object
 
     Returns:
-        List of TextItem objects
+        List of TextItem dictionaries
     """
+    # Hoisted out of the loop
+    provenance = _provenance
+
     texts = []
-    if not hasattr(doc, 'texts'):
-        return texts
-
-    for text_item in doc.texts:
-        bbox = None
-        page = None
-
-        if hasattr(text_item, 'prov') and text_item.prov:
-            page = text_item.prov[0].page_no
-            if hasattr(text_item.prov[0], 'bbox'):
-                bbox = BoundingBox(
-                    left=text_item.prov[0].bbox.l,
-                    top=text_item.prov[0].bbox.t,
-                    right=text_item.prov[0].bbox.r,
-                    bottom=text_item.prov[0].bbox.b
-                )
-
-        texts.append(TextItem(
-            label=text_item.label if hasattr(text_item, 'label') else "unknown",
-            text=text_item.text if hasattr(text_item, 'text') else "",
-            page=page,
-            bbox=bbox
-        ))
+    append = texts.append
+    for text_item in getattr(doc, 'texts', ()):
+        page, raw_bbox = provenance(text_item)
+        append({
+            "label": getattr(text_item, 'label', "unknown"),
+            "text": getattr(text_item, 'text', ""),
+            "page": page,
+            "bbox": {
+                "left": raw_bbox.l,
+                "top": raw_bbox.t,
+                "right": raw_bbox.r,
+                "bottom": raw_bbox.b
+            } if raw_bbox is not None else None
+        })
 
     return texts
 
 
+def _table_csv(data: Any) -> Tuple[int, int, str]:
+    """
+    Row count, column count and CSV for a Docling table, straight from its cell grid
+
+    Produces the same output as export_to_dataframe().to_csv(index=False)
+    without building a DataFrame: leading column-header rows are merged into
+    the header line and the remaining rows become data rows.
+
+    Args:
+        data: Docling TableData (table.data)
+
+    Returns:
+        Tuple of (rows, columns, csv)
+    """
+    grid = data.grid
+    if data.num_rows == 0 or data.num_cols == 0:
+        return 0, 0, ""
+
+    num_headers = 0
+    for row in grid:
+        if not any(cell.column_header for cell in row):
+            break
+        num_headers += 1
+
+    if num_headers:
+        header = [""] * data.num_cols
+        for row in grid[:num_headers]:
+            for j, cell in enumerate(row):
+                header[j] += f".{cell.text}" if header[j] else cell.text
+    else:
+        header = range(data.num_cols)  # pandas labels unnamed columns 0..n-1
+
+    buffer = StringIO()
+    writer = csv.writer(buffer, lineterminator=os.linesep)
+    writer.writerow(header)
+    writer.writerows([cell.text for cell in row] for row in grid[num_headers:])
+
+    return len(grid) - num_headers, data.num_cols, buffer.getvalue()
+
+
 def extract_tables(doc: Any) -> List[TableItem]:
     """
     Extract tables from document
@@ -254,12 +438,10 @@ def extract_tables(doc: Any) -> List[TableItem]:
         List of TableItem objects
     """
     tables = []
-    if not hasattr(doc, 'tables'):
-        return tables
-
-    for table in doc.tables:
+    for table in getattr(doc, 'tables', ()):
         # Export to dict
-        table_dict = table.export_to_dict() if hasattr(table, 'export_to_dict') else {}
+        export_to_dict = getattr(table, 'export_to_dict', None)
+        table_dict = export_to_dict() if export_to_dict is not None else {}
 
         # Try to export to DataFrame and CSV
         dataframe_csv = None
@@ -267,21 +449,17 @@ def extract_tables(doc: Any) -> List[TableItem]:
         columns = None
 
         try:
-            df = table.export_to_dataframe()
-            if df is not None:
-                rows = df.shape[0]
-                columns = df.shape[1]
-                dataframe_csv = df.to_csv(index=False)
+            rows, columns, dataframe_csv = _table_csv(table.data)
         except Exception as e:
-            print(f"Warning: Could not export table to DataFrame: {e}")
+            print(f"Warning: Could not export table to CSV: {e}")
 
         # Get page info
-        page = None
-        if hasattr(table, 'prov') and table.prov:
-            page = table.prov[0].page_no
+        prov = getattr(table, 'prov', None)
+        page = prov[0].page_no if prov else None
 
-        tables.append(TableItem(
-            id=table.self_ref if hasattr(table, 'self_ref') else f"table-{len(tables)+1}",
+        table_id = getattr(table, 'self_ref', None)
+        tables.append(TableItem.model_construct(
+            id=table_id if table_id is not None else f"table-{len(tables)+1}",
             page=page,
             rows=rows,
             columns=columns,
@@ -292,55 +470,58 @@ def extract_tables(doc: Any) -> List[TableItem]:
     return tables
 
 
-def extract_pictures(doc: Any) -> List[PictureItem]:
+def extract_pictures(doc: Any, job_id: str) -> List[PictureItem]:
     """
     Extract pictures/images from document
 
+    Image data is written to OUTPUT_DIR/{job_id}/ and referenced by URL,
+    so result payloads don't carry base64 blobs.
+
     Args:
         doc: Docling document object
+        job_id: Job identifier
 
     Returns:
         List of PictureItem objects
     """
     pictures = []
-    if not hasattr(doc, 'pictures'):
-        return pictures
-
-    for picture in doc.pictures:
-        # Extract basic info
-        page = None
-        bbox = None
-        caption = None
-        image_uri = None
-
+    for index, picture in enumerate(getattr(doc, 'pictures', ())):
         # Get page and bbox
-        if hasattr(picture, 'prov') and picture.prov:
-            page = picture.prov[0].page_no
-            if hasattr(picture.prov[0], 'bbox'):
-                bbox = BoundingBox(
-                    left=picture.prov[0].bbox.l,
-                    top=picture.prov[0].bbox.t,
-                    right=picture.prov[0].bbox.r,
-                    bottom=picture.prov[0].bbox.b
-                )
+        page, raw_bbox = _provenance(picture)
+        bbox = BoundingBox.model_construct(
+            left=raw_bbox.l,
+            top=raw_bbox.t,
+            right=raw_bbox.r,
+            bottom=raw_bbox.b
+        ) if raw_bbox is not None else None
 
         # Get caption
-        if hasattr(picture, 'caption_text'):
+        caption = None
+        caption_text = getattr(picture, 'caption_text', None)
+        if caption_text is not None:
             try:
-                caption = picture.caption_text(doc=doc)
+                caption = caption_text(doc=doc)
             except Exception:
                 pass
 
-        # Get image URI
-        if hasattr(picture, 'image') and picture.image:
-            image_uri = str(picture.image.uri)
-
-        pictures.append(PictureItem(
-            id=picture.self_ref if hasattr(picture, 'self_ref') else f"picture-{len(pictures)+1}",
+        # Save image to disk
+        image_url = None
+        image = getattr(picture, 'image', None)
+        if image:
+            match = _PNG_DATA_URI_RE.match(str(image.uri))
+            if match:
+                image_path = job_image_path(job_id, index)
+                image_path.parent.mkdir(parents=True, exist_ok=True)
+                image_path.write_bytes(base64.b64decode(match.group(1)))
+                image_url = f"/api/v1/parse/results/{job_id}/image/{index}"
+
+        picture_id = getattr(picture, 'self_ref', None)
+        pictures.append(PictureItem.model_construct(
+            id=picture_id if picture_id is not None else f"picture-{len(pictures)+1}",
             page=page,
             bbox=bbox,
             caption=caption,
-            image_uri=image_uri
+            image_url=image_url
         ))
 
     return pictures
@@ -348,13 +529,132 @@ def extract_pictures(doc: Any) -> List[PictureItem]:
 
 def generate_job_id() -> str:
     """Generate unique job ID"""
-    return str(uuid.uuid4())
+    return uuid.uuid4().hex
 
 
 # ============================================================================
 # IMAGE DESCRIPTION UTILITIES
 # ============================================================================
 
+# HTTP statuses worth retrying: timeouts, rate limits and transient server errors
+_RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+_backoff = wait_random_exponential(multiplier=1, max=60)
+
+# Jobs describe their images in parallel (VLM_CONCURRENCY each); this caps the
+# total across concurrent jobs so they don't collectively trip rate limits
+_provider_slots = BoundedSemaphore(settings.VLM_MAX_CONCURRENT_REQUESTS)
+
+
+def _is_retryable_provider_error(exc: BaseException) -> bool:
+    """Check whether a Gemini/OpenAI error is transient"""
+    # OpenAI errors expose status_code, google.api_core errors expose code
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if isinstance(status, int):
+        return status in _RETRYABLE_STATUS_CODES
+
+    return (
+        isinstance(exc, (ConnectionError, TimeoutError))
+        or type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+    )
+
+
+def _retry_after_seconds(exc: Optional[BaseException]) -> Optional[float]:
+    """Read a Retry-After header (in seconds) from a provider error, if any"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _wait_for_provider(retry_state) -> float:
+    """Honour Retry-After when the provider sends one, else back off with jitter"""
+    retry_after = _retry_after_seconds(retry_state.outcome.exception())
+    if retry_after is not None:
+        return min(retry_after, 60)
+    return _backoff(retry_state)
+
+
+@retry(
+    retry=retry_if_exception(_is_retryable_provider_error),
+    wait=_wait_for_provider,
+    stop=stop_after_attempt(6),
+    reraise=True
+)
+def _call_provider(func, *args, **kwargs):
+    """Call a vision provider, retrying transient failures"""
+    # Held per attempt, so a slot isn't tied up while backing off
+    with _provider_slots:
+        return func(*args, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def _sdk_available(module: str, package: str, provider: str) -> bool:
+    """Check once per process whether an optional provider SDK can be imported"""
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        print(f"Warning: {package} not installed. Cannot use {provider}.")
+        return False
+    return True
+
+
+@lru_cache(maxsize=4)
+def _gemini_model(model: str, api_key: str):
+    """Shared Gemini model, configured once instead of on every image"""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model)
+
+
+def _gemini_image(image_uri: str) -> Optional[Dict[str, Any]]:
+    """Turn a base64 data URI into an inline image part for the Gemini SDK (None if malformed)"""
+    # Format: data:image/png;base64,<base64_data>
+    match = _DATA_URI_RE.match(image_uri)
+    if not match:
+        print(f"Warning: Could not parse data URI")
+        return None
+
+    # The SDK takes the encoded bytes as-is - no need to decode them into an image
+    return {"mime_type": match.group(1), "data": base64.b64decode(match.group(2))}
+
+
+def _batch_prompt(prompt: str, count: int) -> str:
+    """Wrap a description prompt so one request describes several images"""
+    return (
+        f"{prompt}\n\nYou are given {count} images. Describe each image separately and "
+        f"reply with only a JSON array of {count} strings: one description per image, "
+        f"in the order the images were given."
+    )
+
+
+def _split_batch_reply(text: str, count: int) -> List[Optional[str]]:
+    """Split a batched reply into per-image descriptions (all None if it doesn't match the batch)"""
+    text = text.strip()
+    if text.startswith("```"):
+        # Models sometimes fence JSON output despite being asked not to
+        text = text.strip("`").removeprefix("json")
+
+    try:
+        descriptions = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        descriptions = None
+
+    if not isinstance(descriptions, list) or len(descriptions) != count:
+        print(f"Warning: Batched description reply didn't contain {count} descriptions")
+        return [None] * count
+
+    return [
+        description.strip() if isinstance(description, str) and description.strip() else None
+        for description in descriptions
+    ]
+
+
 def describe_image_with_gemini(image_uri: str, prompt: str, api_key: str) -> Optional[str]:
     """
     Generate image description using Google Gemini (native SDK)
@@ -368,48 +668,68 @@ def describe_image_with_gemini(image_uri: str, prompt: str, api_key: str) -> Opt
     Returns:
         Description text or None if failed
     """
-    try:
-        import google.generativeai as genai
-        import base64
-        import re
-        from io import BytesIO
-        import PIL.Image
-    except ImportError:
-        print("Warning: google-generativeai or PIL not installed. Cannot use Gemini.")
+    if not _sdk_available("google.generativeai", "google-generativeai", "Gemini"):
         return None
 
+    model = _gemini_model(settings.GEMINI_MODEL, api_key)
+
     try:
-        # Configure Gemini API (same as working version)
-        genai.configure(api_key=api_key)
+        image = _gemini_image(image_uri)
+        if image is None:
+            return None
 
-        # Create model (same as working version)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        response = _call_provider(model.generate_content, [prompt, image])
 
-        # Extract base64 data from data URI
-        # Format: data:image/png;base64,<base64_data>
-        if not image_uri.startswith('data:image/'):
-            print(f"Warning: Invalid image URI format")
-            return None
+        return response.text.strip()
 
-        match = re.match(r'data:image/\w+;base64,(.+)', image_uri)
-        if not match:
-            print(f"Warning: Could not parse data URI")
-            return None
+    except Exception as e:
+        print(f"Warning: Gemini description failed: {e}")
+        return None
 
-        image_base64 = match.group(1)
-        image_data = base64.b64decode(image_base64)
 
-        # Prepare image (exactly like working version)
-        image = PIL.Image.open(BytesIO(image_data))
+def describe_images_with_gemini(image_uris: List[str], prompt: str, api_key: str) -> List[Optional[str]]:
+    """
+    Generate descriptions for several images in one Gemini request
 
-        # Generate description (exactly like working version)
-        response = model.generate_content([prompt, image])
+    Args:
+        image_uris: Base64 data URIs of the images
+        prompt: Description prompt (applied to every image)
+        api_key: Gemini API key
 
-        return response.text.strip()
+    Returns:
+        One description per image, None where it failed
+    """
+    if not _sdk_available("google.generativeai", "google-generativeai", "Gemini"):
+        return [None] * len(image_uris)
+
+    model = _gemini_model(settings.GEMINI_MODEL, api_key)
+
+    try:
+        images = [_gemini_image(image_uri) for image_uri in image_uris]
+        if any(image is None for image in images):
+            return [None] * len(image_uris)
+
+        response = _call_provider(
+            model.generate_content, [_batch_prompt(prompt, len(images)), *images]
+        )
+        return _split_batch_reply(response.text, len(images))
 
     except Exception as e:
-        print(f"Warning: Gemini description failed: {e}")
-        return f"Error: {str(e)}"
+        print(f"Warning: Gemini batch description failed: {e}")
+        return [None] * len(image_uris)
+
+
+@lru_cache(maxsize=4)
+def _openai_chat_model(model: str, api_key: str):
+    """Shared ChatOpenAI client, so its HTTP connection pool is reused across images and jobs"""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=model,
+        api_key=api_key,
+        temperature=0,
+        max_retries=0  # Retries are handled by _call_provider
+    )
 
 
 def describe_image_with_openai(image_uri: str, prompt: str, api_key: str) -> Optional[str]:
@@ -424,19 +744,12 @@ def describe_image_with_openai(image_uri: str, prompt: str, api_key: str) -> Opt
     Returns:
         Description text or None if failed
     """
-    try:
-        from langchain_openai import ChatOpenAI
-    except ImportError:
-        print("Warning: langchain-openai not installed. Cannot use OpenAI.")
+    if not _sdk_available("langchain_openai", "langchain-openai", "OpenAI"):
         return None
 
+    llm = _openai_chat_model(settings.OPENAI_MODEL, api_key)
+
     try:
-        # Create OpenAI vision model
-        llm = ChatOpenAI(
-            model="gpt-4o",
-            api_key=api_key,
-            temperature=0
-        )
 
         # Create message with image
         messages = [
@@ -449,9 +762,45 @@ def describe_image_with_openai(image_uri: str, prompt: str, api_key: str) -> Opt
             }
         ]
 
-        response = llm.invoke(messages)
+        response = _call_provider(llm.invoke, messages)
         return response.content.strip()
 
     except Exception as e:
         print(f"Warning: OpenAI description failed: {e}")
         return None
+
+
+def describe_images_with_openai(image_uris: List[str], prompt: str, api_key: str) -> List[Optional[str]]:
+    """
+    Generate descriptions for several images in one OpenAI request
+
+    Args:
+        image_uris: Base64 data URIs of the images
+        prompt: Description prompt (applied to every image)
+        api_key: OpenAI API key
+
+    Returns:
+        One description per image, None where it failed
+    """
+    if not _sdk_available("langchain_openai", "langchain-openai", "OpenAI"):
+        return [None] * len(image_uris)
+
+    llm = _openai_chat_model(settings.OPENAI_MODEL, api_key)
+
+    try:
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": _batch_prompt(prompt, len(image_uris))},
+                    *({"type": "image_url", "image_url": {"url": image_uri}} for image_uri in image_uris)
+                ]
+            }
+        ]
+
+        response = _call_provider(llm.invoke, messages)
+        return _split_batch_reply(response.content, len(image_uris))
+
+    except Exception as e:
+        print(f"Warning: OpenAI batch description failed: {e}")
+        return [None] * len(image_uris)
@@ -8,12 +8,28 @@ import json
 from pathlib import Path
 from pprint import pprint
 
+import orjson
+
 # Disable symlinks for Windows compatibility
 os.environ["HF_HUB_DISABLE_SYMLINKS"] = "1"
 
-from docling.document_converter import DocumentConverter
+from docling.document_converter import DocumentConverter, PdfFormatOption
+from docling.datamodel.base_models import InputFormat
+from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
 from docling_core.types.doc import TextItem, TableItem, PictureItem
 
+# The threaded pipeline overlaps page parsing, layout and table inference
+# across pages; fall back to the serial pipeline on older docling versions
+try:
+    from docling.datamodel.pipeline_options import ThreadedPdfPipelineOptions as PIPELINE_OPTIONS_CLS
+    from docling.pipeline.threaded_standard_pdf_pipeline import ThreadedStandardPdfPipeline as PDF_PIPELINE
+except ImportError:
+    from docling.datamodel.pipeline_options import PdfPipelineOptions as PIPELINE_OPTIONS_CLS
+    from docling.pipeline.standard_pdf_pipeline import StandardPdfPipeline as PDF_PIPELINE
+
+# Use every core and let ONNX Runtime / Torch pick up CUDA or MPS when present
+ACCELERATOR_OPTIONS = AcceleratorOptions(num_threads=os.cpu_count(), device=AcceleratorDevice.AUTO)
+
 def print_section(title):
     """Print a formatted section header"""
     print("\n" + "="*80)
@@ -28,7 +44,16 @@ def main():
     print(f"Converting: {source}")
 
     # Initialize converter
-    converter = DocumentConverter()
+    pipeline_options = PIPELINE_OPTIONS_CLS()
+    pipeline_options.accelerator_options = ACCELERATOR_OPTIONS
+    converter = DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(
+                pipeline_cls=PDF_PIPELINE,
+                pipeline_options=pipeline_options
+            )
+        }
+    )
 
     # Convert the document
     result = converter.convert(source)
@@ -219,8 +244,8 @@ def main():
 
     # Save JSON
     json_file = output_dir / "document.json"
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(doc_dict, f, indent=2, ensure_ascii=False)
+    with open(json_file, "wb") as f:
+        f.write(orjson.dumps(doc_dict, option=orjson.OPT_INDENT_2))
     print(f"✓ JSON saved to: {json_file}")
 
     # Save raw document using docling's native save
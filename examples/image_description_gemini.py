@@ -4,10 +4,20 @@ Uses Google Gemini Vision API instead of local models
 """
 
 import os
+import argparse
+import time
+import random
+import threading
+import queue
 import base64
+import hashlib
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO, StringIO
 from pathlib import Path
 
+import orjson
+
 # Windows compatibility
 os.environ["HF_HUB_DISABLE_SYMLINKS"] = "1"
 
@@ -17,7 +27,77 @@ load_dotenv()
 
 from docling.document_converter import DocumentConverter, PdfFormatOption
 from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
+from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
+from docling.backend.docling_parse_v4_backend import DoclingParseV4DocumentBackend
+from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Gemini only sees the cropped pictures and their captions, so pypdfium's
+# rougher text cells cost nothing here and it parses much faster
+USE_FAST_BACKEND = True
+PDF_BACKEND = PyPdfiumDocumentBackend if USE_FAST_BACKEND else DoclingParseV4DocumentBackend
+
+# Layout detection is the only model run locally; the threaded pipeline runs
+# it on one page while the next is rendered (serial fallback on older docling)
+try:
+    from docling.datamodel.pipeline_options import ThreadedPdfPipelineOptions as PIPELINE_OPTIONS_CLS
+    from docling.pipeline.threaded_standard_pdf_pipeline import ThreadedStandardPdfPipeline as PDF_PIPELINE
+except ImportError:
+    from docling.datamodel.pipeline_options import PdfPipelineOptions as PIPELINE_OPTIONS_CLS
+    from docling.pipeline.standard_pdf_pipeline import StandardPdfPipeline as PDF_PIPELINE
+
+# Give the local layout model every core and a CUDA or MPS device if present
+ACCELERATOR_OPTIONS = AcceleratorOptions(num_threads=os.cpu_count(), device=AcceleratorDevice.AUTO)
+
+# Parallel Gemini requests (keep within your API rate limits)
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "8"))
+
+# Parallel image file writes at the end of the run
+IMAGE_WRITE_WORKERS = 4
+
+# Pictures sent per Gemini request; one request per batch cuts round-trips and RPM use
+GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", "4"))
+
+# Descriptions are cached by image bytes + prompt; set GEMINI_NO_CACHE=1 to regenerate
+CACHE_DIR = Path("output/.gemini_cache")
+USE_CACHE = os.getenv("GEMINI_NO_CACHE", "").lower() not in ("1", "true", "yes")
+
+# Retry transient Gemini errors with exponential backoff (seconds)
+RETRY_MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 60
+
+# Gemini's vision encoder downsamples large inputs anyway, so bigger pictures
+# are shrunk to this many pixels per side (JPEG) before upload
+MAX_IMAGE_DIM = 1024
+JPEG_QUALITY = 85
+
+# Picture data URIs: data:image/<format>;base64,<payload>
+DATA_URI_RE = re.compile(r'data:image/(\w+);base64,(.+)', re.DOTALL)
+
+# Batched replies prefix each description with "IMAGE k:" (sometimes in bold)
+BATCH_REPLY_RE = re.compile(r'\**IMAGE \d+:\**\s*')
+
+class RateLimiter:
+    """Spaces requests evenly to stay under a requests-per-minute limit (thread-safe)"""
+
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm
+        self.lock = threading.Lock()
+        self.next_ok = 0.0
+
+    def acquire(self):
+        # Reserve the next slot under the lock, then wait for it outside it
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_ok)
+            self.next_ok = slot + self.interval
+        time.sleep(slot - now)
+
+
+# Shared by all worker threads - keep below your Gemini tier's RPM limit
+limiter = RateLimiter(rpm=int(os.getenv("GEMINI_RPM", "30")))
 
 def setup_gemini():
     """Setup Gemini API"""
@@ -45,25 +125,100 @@ def setup_gemini():
     print(f"✓ API Key loaded (ends with: ...{api_key[-4:]})")
     return genai
 
-def describe_image_with_gemini(genai, image_data, image_format, prompt):
+def prepare_image(image_data, image_format):
+    """Build the Gemini image part, shrinking pictures larger than MAX_IMAGE_DIM"""
+    from PIL import Image
+
+    # Image.open only reads the header, so small pictures are never decoded
+    # and go to Gemini as the original encoded bytes
+    image = Image.open(BytesIO(image_data))
+    if max(image.size) <= MAX_IMAGE_DIM:
+        return {"mime_type": f"image/{image_format}", "data": image_data}
+
+    image.thumbnail((MAX_IMAGE_DIM, MAX_IMAGE_DIM), Image.LANCZOS)
+    buf = BytesIO()
+    image.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY)
+    return {"mime_type": "image/jpeg", "data": buf.getvalue()}
+
+def cache_path_for(image_data, prompt):
+    """Cache file for the description of image_data under prompt"""
+    key = hashlib.sha256(image_data + prompt.encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{key}.txt"
+
+def generate_with_retry(model, parts):
+    """Call Gemini and return the reply text
+
+    Rate limits (429), transient server errors (500, 503) and timeouts are
+    retried with exponential backoff and jitter; the last error is raised
+    if all attempts fail.
+    """
+    from google.api_core import exceptions as gexc
+
+    for attempt in range(RETRY_MAX_ATTEMPTS):
+        try:
+            limiter.acquire()
+            response = model.generate_content(parts)
+            return response.text.strip()
+
+        except (gexc.ResourceExhausted, gexc.InternalServerError,
+                gexc.ServiceUnavailable, gexc.DeadlineExceeded):
+            if attempt == RETRY_MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) + random.uniform(0, 1))
+
+def describe_image_with_gemini(model, image_data, image_format, prompt):
     """Send image to Gemini and get description"""
-    try:
-        # Create model
-        model = genai.GenerativeModel('gemini-2.5-flash')
-
-        # Prepare image
-        import PIL.Image
-        from io import BytesIO
-
-        image = PIL.Image.open(BytesIO(image_data))
-
-        # Generate description
-        response = model.generate_content([prompt, image])
-
-        return response.text.strip()
-
-    except Exception as e:
-        return f"Error: {str(e)}"
+    # Reuse the description from an earlier run if this image was seen before
+    cache_path = cache_path_for(image_data, prompt)
+    if USE_CACHE and cache_path.exists():
+        return cache_path.read_text(encoding="utf-8")
+
+    # Generate description
+    description = generate_with_retry(model, [prompt, prepare_image(image_data, image_format)])
+
+    if USE_CACHE:
+        cache_path.write_text(description, encoding="utf-8")
+    return description
+
+def describe_images_with_gemini(model, records, prompt):
+    """Describe a batch of records in one Gemini request, filling record['desc']
+
+    Cached descriptions are reused. If the reply can't be split into one
+    description per image, each image is described on its own instead.
+    """
+    pending = []
+    for record in records:
+        cache_path = cache_path_for(record['data'], prompt)
+        if USE_CACHE and cache_path.exists():
+            record['desc'] = cache_path.read_text(encoding="utf-8")
+        else:
+            pending.append((record, cache_path))
+
+    if len(pending) > 1:
+        parts = [
+            f"{prompt}\n\nYou are given {len(pending)} images. Describe each image "
+            f"separately, one paragraph each, prefixed with 'IMAGE k:' where k is "
+            f"its position (1 to {len(pending)})."
+        ]
+        parts += [prepare_image(record['data'], record['fmt']) for record, _ in pending]
+        descriptions = [d.strip() for d in BATCH_REPLY_RE.split(generate_with_retry(model, parts))[1:]]
+
+        if len(descriptions) == len(pending) and all(descriptions):
+            for (record, cache_path), description in zip(pending, descriptions):
+                record['desc'] = description
+                if USE_CACHE:
+                    cache_path.write_text(description, encoding="utf-8")
+            return records
+
+    # Single image, or a batched reply that didn't match the batch
+    for record, _ in pending:
+        record['desc'] = describe_image_with_gemini(model, record['data'], record['fmt'], prompt)
+    return records
+
+def write_image(path, image_data):
+    """Write one extracted image to disk"""
+    with open(path, "wb") as f:
+        f.write(image_data)
 
 def extract_image_data(picture):
     """Extract base64 image data from picture object"""
@@ -72,11 +227,11 @@ def extract_image_data(picture):
 
     uri_str = str(picture.image.uri)
 
-    if not uri_str.startswith('data:'):
+    if not uri_str.startswith('data:image/'):
         return None, None
 
     # Parse data URI
-    match = re.match(r'data:image/(\w+);base64,(.+)', uri_str)
+    match = DATA_URI_RE.match(uri_str)
     if not match:
         return None, None
 
@@ -86,87 +241,34 @@ def extract_image_data(picture):
 
     return image_data, image_format
 
-def main():
-    print("\n" + "="*80)
-    print("  IMAGE DESCRIPTION WITH GEMINI API")
-    print("="*80 + "\n")
-
-    # Setup Gemini
-    print("Setting up Gemini API...")
-    genai = setup_gemini()
-    print("✓ Gemini API configured\n")
-
-    source = "picture_classification.pdf"
-    print(f"Processing: {source}\n")
+def save_document(result, doc_records, pretty=False, slim=False):
+    """
+    Print one document's descriptions and write its markdown, JSON and images
 
-    # =========================================================================
-    # EXTRACT IMAGES (without AI descriptions)
-    # =========================================================================
-    print("Extracting images from PDF...")
-
-    pipeline_options = PdfPipelineOptions()
-    pipeline_options.generate_picture_images = True
-    pipeline_options.images_scale = 2.0
-    # Note: do_picture_description = False (we'll use Gemini instead)
-
-    converter = DocumentConverter(
-        format_options={
-            InputFormat.PDF: PdfFormatOption(
-                pipeline_options=pipeline_options
-            )
-        }
-    )
+    Args:
+        result: Docling conversion result
+        doc_records: Picture records of this document
+        pretty: Indent the JSON output
+        slim: Reference the saved image files instead of embedding base64 data
 
-    result = converter.convert(source)
+    Returns:
+        Output paths (markdown, JSON, images directory)
+    """
     doc = result.document
-
-    print(f"✓ Extraction complete")
-    print(f"✓ Status: {result.status}")
-    print(f"✓ Images found: {len(doc.pictures)}\n")
-
-    if not doc.pictures:
-        print("No images found in document.")
-        return
-
-    # =========================================================================
-    # DESCRIBE IMAGES WITH GEMINI
-    # =========================================================================
-    print("="*80)
-    print("  GENERATING DESCRIPTIONS WITH GEMINI")
-    print("="*80 + "\n")
-
-    prompt = "Describe this image in a small paragraph. Be concise and accurate."
-
-    image_descriptions = {}
-
-    for i, picture in enumerate(doc.pictures, 1):
-        print(f"Processing Image {i}/{len(doc.pictures)}...")
-
-        # Extract image data
-        image_data, image_format = extract_image_data(picture)
-
-        if image_data is None:
-            print(f"  ⚠ Could not extract image data\n")
-            image_descriptions[picture.self_ref] = "Image data not available"
-            continue
-
-        # Get description from Gemini
-        description = describe_image_with_gemini(genai, image_data, image_format, prompt)
-        image_descriptions[picture.self_ref] = description
-
-        print(f"  ✓ Description: {description[:80]}...")
-        print()
+    stem = Path(result.input.file).stem
+    image_descriptions = {record['picture'].self_ref: record['desc'] for record in doc_records}
 
     # =========================================================================
     # DISPLAY RESULTS
     # =========================================================================
     print("="*80)
-    print("  RESULTS")
+    print(f"  RESULTS: {result.input.file.name}")
     print("="*80 + "\n")
 
-    for i, picture in enumerate(doc.pictures, 1):
+    for record in doc_records:
+        picture = record['picture']
         print("-" * 80)
-        print(f"IMAGE {i}")
+        print(f"IMAGE {record['index']}")
         print("-" * 80)
 
         # Page info
@@ -179,73 +281,75 @@ def main():
             print(f"Original Caption: {caption}")
 
         # Gemini description
-        description = image_descriptions.get(picture.self_ref, "No description")
         print(f"\nGemini Description:")
-        print(f"  {description}")
+        print(f"  {record['desc']}")
         print()
 
     # =========================================================================
     # CREATE MARKDOWN WITH DESCRIPTIONS
     # =========================================================================
-    print("="*80)
-    print("  CREATING MARKDOWN OUTPUT")
-    print("="*80 + "\n")
-
     from docling_core.types.doc import TextItem, PictureItem
 
-    markdown_lines = ["# Document with Gemini Image Descriptions\n\n"]
+    buf = StringIO()
+    buf.write("# Document with Gemini Image Descriptions\n\n")
 
     for item, level in doc.iterate_items():
         if isinstance(item, TextItem):
             # Add text content
             if item.label == "title":
-                markdown_lines.append(f"# {item.text}\n\n")
+                buf.write(f"# {item.text}\n\n")
             elif item.label == "section_header":
-                markdown_lines.append(f"## {item.text}\n\n")
+                buf.write(f"## {item.text}\n\n")
             elif item.label == "paragraph":
-                markdown_lines.append(f"{item.text}\n\n")
+                buf.write(f"{item.text}\n\n")
             elif item.label == "list_item":
-                markdown_lines.append(f"- {item.text}\n")
+                buf.write(f"- {item.text}\n")
 
         elif isinstance(item, PictureItem):
             # Add image with Gemini description
-            markdown_lines.append(f"\n---\n\n")
-            markdown_lines.append(f"**📷 Image ({item.self_ref})**\n\n")
+            buf.write(f"\n---\n\n")
+            buf.write(f"**📷 Image ({item.self_ref})**\n\n")
 
             # Page number
             if item.prov:
-                markdown_lines.append(f"*Page {item.prov[0].page_no}*\n\n")
+                buf.write(f"*Page {item.prov[0].page_no}*\n\n")
 
             # Original caption
             caption = item.caption_text(doc=doc) if hasattr(item, 'caption_text') else None
             if caption:
-                markdown_lines.append(f"**Original Caption:** {caption}\n\n")
+                buf.write(f"**Original Caption:** {caption}\n\n")
 
             # Gemini description
             description = image_descriptions.get(item.self_ref, "No description available")
-            markdown_lines.append(f"**AI Description (Gemini):** {description}\n\n")
+            buf.write(f"**AI Description (Gemini):** {description}\n\n")
 
-            markdown_lines.append(f"---\n\n")
+            buf.write(f"---\n\n")
 
-    markdown_output = "".join(markdown_lines)
+    markdown_output = buf.getvalue()
 
     # =========================================================================
     # SAVE OUTPUTS
     # =========================================================================
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
+    images_dir = output_dir / "images"
 
     # Save markdown with descriptions
-    md_file = output_dir / "gemini_descriptions.md"
+    md_file = output_dir / f"{stem}_gemini_descriptions.md"
     with open(md_file, "w", encoding="utf-8") as f:
         f.write(markdown_output)
     print(f"✓ Markdown with descriptions: {md_file}")
 
     # Save JSON with descriptions
-    import json
-
     doc_dict = doc.export_to_dict()
 
+    if slim:
+        # The pictures are saved as separate files below, so point at those
+        # instead of repeating their base64 payloads in the JSON
+        for record, picture_dict in zip(doc_records, doc_dict.get("pictures", [])):
+            if record['data'] and picture_dict.get("image"):
+                picture_dict["image"]["uri"] = f"images/{stem}_image_{record['index']}.{record['fmt']}"
+
     # Add Gemini descriptions to the JSON
     json_output = {
         "document": doc_dict,
@@ -253,49 +357,212 @@ def main():
             {
                 "image_ref": ref,
                 "description": desc,
-                "model": "gemini-2.5-flash"
+                "model": GEMINI_MODEL
             }
             for ref, desc in image_descriptions.items()
         ]
     }
 
-    json_file = output_dir / "gemini_descriptions.json"
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(json_output, f, indent=2)
+    json_file = output_dir / f"{stem}_gemini_descriptions.json"
+    json_options = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if pretty else 0)
+    with open(json_file, "wb", buffering=1 << 20) as f:
+        f.write(orjson.dumps(json_output, option=json_options))
     print(f"✓ JSON with descriptions: {json_file}")
 
     # Save images
-    images_dir = output_dir / "images"
     images_dir.mkdir(exist_ok=True)
 
-    for i, picture in enumerate(doc.pictures, 1):
-        image_data, image_format = extract_image_data(picture)
-        if image_data:
-            image_file = images_dir / f"image_{i}.{image_format}"
-            with open(image_file, "wb") as f:
-                f.write(image_data)
-            print(f"✓ Image {i}: {image_file}")
+    # Overlap the file writes instead of doing them one after another
+    saved = [
+        (record, images_dir / f"{stem}_image_{record['index']}.{record['fmt']}")
+        for record in doc_records if record['data']
+    ]
+    with ThreadPoolExecutor(max_workers=IMAGE_WRITE_WORKERS) as executor:
+        # list() surfaces any write error here
+        list(executor.map(write_image, [path for _, path in saved], [record['data'] for record, _ in saved]))
+
+    for record, image_file in saved:
+        print(f"✓ Image {record['index']}: {image_file}")
+
+    print("\nPreview of output:\n")
+    print(markdown_output[:600])
+    print("...\n")
+
+    return md_file, json_file, images_dir
+
+def main(sources, pretty=False, slim=False):
+    print("\n" + "="*80)
+    print("  IMAGE DESCRIPTION WITH GEMINI API")
+    print("="*80 + "\n")
+
+    # Setup Gemini
+    print("Setting up Gemini API...")
+    genai = setup_gemini()
+    model = genai.GenerativeModel(GEMINI_MODEL)  # Shared by all worker threads
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    print("✓ Gemini API configured\n")
+
+    print(f"Processing: {', '.join(sources)}\n")
+
+    # =========================================================================
+    # EXTRACT IMAGES (without AI descriptions)
+    # =========================================================================
+    print("Extracting images from PDF...")
+
+    pipeline_options = PIPELINE_OPTIONS_CLS()
+    pipeline_options.accelerator_options = ACCELERATOR_OPTIONS
+    # Gemini describes the pictures and table cells are never printed, so the
+    # local TableFormer pass would be wasted work
+    pipeline_options.do_table_structure = False
+    pipeline_options.generate_picture_images = True
+    # prepare_image() caps uploads at MAX_IMAGE_DIM, so a 2x render would
+    # only be scaled back down before it is sent to Gemini
+    pipeline_options.images_scale = 1.0
+    # Note: do_picture_description = False (we'll use Gemini instead)
+
+    converter = DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(
+                pipeline_cls=PDF_PIPELINE,
+                pipeline_options=pipeline_options,
+                backend=PDF_BACKEND
+            )
+        }
+    )
+
+    prompt = "Describe this image in a small paragraph. Be concise and accurate."
+
+    # Conversion (CPU) runs in a producer thread that queues a document's
+    # pictures once that whole document is converted, while the main thread
+    # batches queued pictures into Gemini requests (network). convert_all()
+    # only yields finished documents, so with a single PDF nothing overlaps;
+    # with several, earlier documents are described while later ones convert.
+    # One record per picture is kept for display, markdown, JSON and saving images.
+    records = []
+    converted = []
+    producer_errors = []
+    picture_queue = queue.Queue()
+
+    def produce():
+        try:
+            for result in converter.convert_all(sources, raises_on_error=False):
+                converted.append((result, []))
+                doc_records = converted[-1][1]
+                print(f"✓ Extracted {result.input.file.name}")
+                print(f"✓ Status: {result.status}")
+                print(f"✓ Images found: {len(result.document.pictures)}\n")
+
+                for i, picture in enumerate(result.document.pictures, 1):
+                    image_data, image_format = extract_image_data(picture)
+                    record = {
+                        'name': result.input.file.name, 'index': i, 'picture': picture,
+                        'data': image_data, 'fmt': image_format, 'desc': None, 'failed': False
+                    }
+                    records.append(record)
+                    doc_records.append(record)
+
+                    if image_data is None:
+                        print(f"{record['name']} image {i}: ⚠ Could not extract image data\n")
+                        record['desc'] = "Image data not available"
+                        continue
+
+                    picture_queue.put(record)
+        except Exception as e:
+            # Handed to the main thread, which re-raises it once the queue is drained
+            producer_errors.append(e)
+        finally:
+            picture_queue.put(None)  # No more pictures
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    # =========================================================================
+    # DESCRIBE IMAGES WITH GEMINI (as they are extracted)
+    # =========================================================================
+    def worker(batch):
+        try:
+            describe_images_with_gemini(model, batch, prompt)
+        except Exception as e:
+            for record in batch:
+                if record['desc'] is None:
+                    record['failed'] = True
+                    record['desc'] = f"Error: {str(e)}"
+        return batch
+
+    # Several pictures go in each request, and each request is a network
+    # round-trip, so send several batches at once
+    with ThreadPoolExecutor(max_workers=GEMINI_CONCURRENCY) as executor:
+        futures = []
+        batch = []
+        while (record := picture_queue.get()) is not None:
+            batch.append(record)
+            if len(batch) == GEMINI_BATCH_SIZE:
+                futures.append(executor.submit(worker, batch))
+                batch = []
+        if batch:
+            futures.append(executor.submit(worker, batch))
+
+        if futures:
+            print("="*80)
+            print("  GENERATING DESCRIPTIONS WITH GEMINI")
+            print("="*80 + "\n")
+
+        for future in as_completed(futures):
+            for record in future.result():
+                print(f"{record['name']} image {record['index']}:")
+                print(f"  ✓ Description: {record['desc'][:80]}...")
+                print()
+
+    producer.join()
+
+    if producer_errors:
+        raise producer_errors[0]
+
+    if not converted:
+        print("Conversion failed.")
+        return
+
+    if not records:
+        print("No images found in document.")
+        return
+
+    outputs = [
+        save_document(result, doc_records, pretty=pretty, slim=slim)
+        for result, doc_records in converted
+        if doc_records
+    ]
 
     # =========================================================================
     # SUMMARY
     # =========================================================================
-    print("\n" + "="*80)
+    failed_images = [f"{record['name']}:{record['picture'].self_ref}" for record in records if record['failed']]
+
+    print("="*80)
     print("  SUMMARY")
     print("="*80 + "\n")
 
-    print(f"Total Images: {len(doc.pictures)}")
-    print(f"Descriptions Generated: {len(image_descriptions)}")
+    print(f"Documents: {len(converted)}")
+    print(f"Total Images: {len(records)}")
+    print(f"Descriptions Generated: {len(records) - len(failed_images)}")
+    if failed_images:
+        print(f"Failed: {len(failed_images)} ({', '.join(failed_images)})")
     print(f"Model Used: Gemini 1.5 Flash")
     print(f"\nOutputs:")
-    print(f"  • Markdown: {md_file}")
-    print(f"  • JSON: {json_file}")
-    print(f"  • Images: {images_dir}/")
+    for md_file, json_file, images_dir in outputs:
+        print(f"  • Markdown: {md_file}")
+        print(f"  • JSON: {json_file}")
+    print(f"  • Images: {outputs[0][2]}/")
 
     print("\n" + "="*80)
-    print("\nPreview of output:\n")
-    print(markdown_output[:600])
-    print("...")
-    print("\n" + "="*80)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("sources", nargs="*", default=["picture_classification.pdf"],
+                        help="PDF files or URLs; with several, description overlaps conversion of the next")
+    parser.add_argument("--pretty", action="store_true",
+                        help="Indent the JSON output for reading (larger and slower to write)")
+    parser.add_argument("--slim", action="store_true",
+                        help="Reference the saved image files in the JSON instead of embedding base64 data")
+    args = parser.parse_args()
+
+    main(args.sources, pretty=args.pretty, slim=args.slim)
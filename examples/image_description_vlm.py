@@ -4,29 +4,59 @@ Uses Vision-Language Models to automatically describe images in PDFs
 """
 
 import os
+import sys
+from functools import lru_cache
+from io import StringIO
 from pathlib import Path
 
 # Disable symlinks for Windows compatibility
 os.environ["HF_HUB_DISABLE_SYMLINKS"] = "1"
+# Once the models are cached, run with HF_HUB_OFFLINE=1 to skip revalidating them online
 
 from docling.document_converter import DocumentConverter, PdfFormatOption
 from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions, PictureDescriptionVlmOptions
+from docling.datamodel.pipeline_options import PictureDescriptionVlmOptions
+from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
+from docling.backend.docling_parse_v4_backend import DoclingParseV4DocumentBackend
+from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
 from docling_core.types.doc.document import PictureDescriptionData
 from docling_core.transforms.serializer.markdown import MarkdownDocSerializer
 
+# SmolVLM reads the rendered pictures, not the PDF's text layer, so the
+# faster pypdfium backend costs nothing in description quality
+USE_FAST_BACKEND = True
+PDF_BACKEND = PyPdfiumDocumentBackend if USE_FAST_BACKEND else DoclingParseV4DocumentBackend
+
+# The threaded pipeline renders pages and runs layout detection on several
+# pages at once before SmolVLM describes the collected pictures; older
+# docling versions only have the serial pipeline
+try:
+    from docling.datamodel.pipeline_options import ThreadedPdfPipelineOptions as PIPELINE_OPTIONS_CLS
+    from docling.pipeline.threaded_standard_pdf_pipeline import ThreadedStandardPdfPipeline as PDF_PIPELINE
+except ImportError:
+    from docling.datamodel.pipeline_options import PdfPipelineOptions as PIPELINE_OPTIONS_CLS
+    from docling.pipeline.standard_pdf_pipeline import StandardPdfPipeline as PDF_PIPELINE
+
+# SmolVLM dominates the run time, so let AUTO move it to CUDA or MPS when present
+ACCELERATOR_OPTIONS = AcceleratorOptions(num_threads=os.cpu_count(), device=AcceleratorDevice.AUTO)
+
+# Optional pinned model directory (prefetch with `docling-tools models download`);
+# unset, models are downloaded to and loaded from the Hugging Face cache
+ARTIFACTS_PATH = os.getenv("DOCLING_ARTIFACTS_PATH")
+
 def print_section(title):
     """Print formatted section header"""
     print("\n" + "="*80)
     print(f"  {title}")
     print("="*80 + "\n")
 
-def main():
-    source = "picture_classification.pdf"
-
-    print_section("AI IMAGE DESCRIPTION WITH VLM")
-    print(f"Processing: {source}\n")
+@lru_cache(maxsize=1)
+def build_converter():
+    """Build the VLM converter once and load its models
 
+    The converter is cached, so every document converted in this process
+    reuses the same loaded layout and VLM weights.
+    """
     print("NOTE: This script uses AI models to describe images.")
     print("First run will download VLM models (~500MB-2GB).")
     print("Requires internet connection and may take a few minutes.\n")
@@ -39,10 +69,18 @@ def main():
     print("  - Speed: Fast")
     print("  - Quality: Good for general descriptions\n")
 
-    pipeline_options = PdfPipelineOptions()
+    pipeline_options = PIPELINE_OPTIONS_CLS()
+    pipeline_options.accelerator_options = ACCELERATOR_OPTIONS
+    # SmolVLM already needs most of the memory and time; a second heavy model
+    # for table structure this script never prints isn't worth it
+    pipeline_options.do_table_structure = False
     pipeline_options.generate_picture_images = True
-    pipeline_options.images_scale = 2.0
+    # SmolVLM's image processor resizes every picture to its own input size,
+    # so a 2x crop is only rendered to be scaled straight back down
+    pipeline_options.images_scale = 1.0
     pipeline_options.do_picture_description = True
+    if ARTIFACTS_PATH:
+        pipeline_options.artifacts_path = Path(ARTIFACTS_PATH).expanduser()
 
     # SmolVLM configuration
     from docling.datamodel.pipeline_options import smolvlm_picture_description
@@ -71,19 +109,31 @@ def main():
     #     prompt="Your custom prompt here.",
     # )
 
-    # =========================================================================
-    # CONVERT DOCUMENT
-    # =========================================================================
     converter = DocumentConverter(
         format_options={
             InputFormat.PDF: PdfFormatOption(
-                pipeline_options=pipeline_options
+                pipeline_cls=PDF_PIPELINE,
+                pipeline_options=pipeline_options,
+                backend=PDF_BACKEND
             )
         }
     )
 
-    print("Converting and describing images...")
+    # Load the models now rather than inside the first convert()
+    print("Loading models...")
     print("(This may take a minute on first run)\n")
+    converter.initialize_pipeline(InputFormat.PDF)
+    return converter
+
+def describe_document(converter, source):
+    """Convert one PDF, describing its images, and save the markdown outputs"""
+    print_section("AI IMAGE DESCRIPTION WITH VLM")
+    print(f"Processing: {source}\n")
+
+    # =========================================================================
+    # CONVERT DOCUMENT
+    # =========================================================================
+    print("Converting and describing images...")
 
     result = converter.convert(source)
     doc = result.document
@@ -137,7 +187,7 @@ def main():
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
 
-    output_file = output_dir / "document_with_image_descriptions.md"
+    output_file = output_dir / f"{Path(source).stem}_with_image_descriptions.md"
     with open(output_file, "w", encoding="utf-8") as f:
         f.write(markdown_with_descriptions)
 
@@ -153,8 +203,8 @@ def main():
     # =========================================================================
     print_section("CUSTOM FORMAT: Images with Descriptions")
 
-    custom_output = []
-    custom_output.append("# Document with AI-Described Images\n")
+    custom_output = StringIO()
+    custom_output.write("# Document with AI-Described Images\n")
 
     # Export text and images with descriptions
     for item, level in doc.iterate_items():
@@ -163,34 +213,34 @@ def main():
         if isinstance(item, TextItem):
             # Add text items
             if item.label == "title":
-                custom_output.append(f"\n# {item.text}\n")
+                custom_output.write(f"\n# {item.text}\n")
             elif item.label == "section_header":
-                custom_output.append(f"\n{'#' * (level + 1)} {item.text}\n")
+                custom_output.write(f"\n{'#' * (level + 1)} {item.text}\n")
             elif item.label == "paragraph":
-                custom_output.append(f"\n{item.text}\n")
+                custom_output.write(f"\n{item.text}\n")
 
         elif isinstance(item, PictureItem):
             # Add images with descriptions
-            custom_output.append(f"\n---\n")
-            custom_output.append(f"**Image {item.self_ref}**\n\n")
+            custom_output.write(f"\n---\n")
+            custom_output.write(f"**Image {item.self_ref}**\n\n")
 
             # Caption
             caption = item.caption_text(doc=doc) if hasattr(item, 'caption_text') else None
             if caption:
-                custom_output.append(f"*Caption:* {caption}\n\n")
+                custom_output.write(f"*Caption:* {caption}\n\n")
 
             # AI Description
             if hasattr(item, 'annotations'):
                 for annotation in item.annotations:
                     if isinstance(annotation, PictureDescriptionData):
-                        custom_output.append(f"*AI Description:* {annotation.text}\n\n")
+                        custom_output.write(f"*AI Description:* {annotation.text}\n\n")
 
-            custom_output.append(f"---\n")
+            custom_output.write(f"---\n")
 
-    custom_markdown = "".join(custom_output)
+    custom_markdown = custom_output.getvalue()
 
     # Save custom format
-    custom_file = output_dir / "custom_image_descriptions.md"
+    custom_file = output_dir / f"{Path(source).stem}_custom_image_descriptions.md"
     with open(custom_file, "w", encoding="utf-8") as f:
         f.write(custom_markdown)
 
@@ -215,5 +265,11 @@ def main():
     print("  - Custom model: Add your Hugging Face repo_id in Option 3")
     print("="*80)
 
+def main(sources):
+    # One converter for all documents, so the models are only loaded once
+    converter = build_converter()
+    for source in sources:
+        describe_document(converter, source)
+
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:] or ["picture_classification.pdf"])
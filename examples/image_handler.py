@@ -4,25 +4,59 @@ Extract, save, and describe images from PDFs
 """
 
 import os
-import json
+import re
+import base64
+import argparse
 from pathlib import Path
 
+import orjson
+
 # Disable symlinks for Windows compatibility
 os.environ["HF_HUB_DISABLE_SYMLINKS"] = "1"
 
 from docling.document_converter import DocumentConverter, PdfFormatOption
 from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
+from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
+from docling.backend.docling_parse_v4_backend import DoclingParseV4DocumentBackend
+from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
 from docling_core.types.doc import ImageRefMode
 from docling_core.transforms.serializer.markdown import MarkdownDocSerializer, MarkdownParams
 
+# The exports keep the text around each picture, and pypdfium's text cells
+# are good enough for that while parsing much faster; set USE_FAST_BACKEND
+# to False when the exact text layout matters
+USE_FAST_BACKEND = True
+PDF_BACKEND = PyPdfiumDocumentBackend if USE_FAST_BACKEND else DoclingParseV4DocumentBackend
+
+# With the threaded pipeline, layout detection and picture cropping on one
+# page overlap rendering of the next; older docling only has the serial one
+try:
+    from docling.datamodel.pipeline_options import ThreadedPdfPipelineOptions as PIPELINE_OPTIONS_CLS
+    from docling.pipeline.threaded_standard_pdf_pipeline import ThreadedStandardPdfPipeline as PDF_PIPELINE
+except ImportError:
+    from docling.datamodel.pipeline_options import PdfPipelineOptions as PIPELINE_OPTIONS_CLS
+    from docling.pipeline.standard_pdf_pipeline import StandardPdfPipeline as PDF_PIPELINE
+
+# Use every core and let ONNX Runtime / Torch pick up CUDA or MPS when present
+ACCELERATOR_OPTIONS = AcceleratorOptions(num_threads=os.cpu_count(), device=AcceleratorDevice.AUTO)
+
+# Picture data URIs: data:image/<format>;base64,<payload>
+DATA_URI_RE = re.compile(r'data:image/(\w+);base64,(.+)', re.DOTALL)
+
+# Docling's default markdown placeholder for pictures
+DEFAULT_IMAGE_PLACEHOLDER = "<!-- image -->"
+# Marks pictures without image data in the shared serialization
+IMAGE_SENTINEL = "<!-- picture-without-image -->"
+# A picture in the embedded serialization: data-URI image or sentinel
+PICTURE_MARKDOWN_RE = re.compile(r"!\[[^\]]*\]\(data:[^)]*\)|" + re.escape(IMAGE_SENTINEL))
+
 def print_section(title):
     """Print formatted section header"""
     print("\n" + "="*80)
     print(f"  {title}")
     print("="*80 + "\n")
 
-def main():
+def main(images_scale=2.0, pretty=False):
     source = "picture_classification.pdf"
 
     print_section("IMAGE EXTRACTION AND HANDLING")
@@ -33,11 +67,20 @@ def main():
     # =========================================================================
     print("Configuring image extraction options:")
     print("  ✓ generate_picture_images = True (extract and save images)")
-    print("  ✓ images_scale = 2.0 (higher quality)")
-
-    pipeline_options = PdfPipelineOptions()
+    print(f"  ✓ images_scale = {images_scale}")
+
+    pipeline_options = PIPELINE_OPTIONS_CLS()
+    pipeline_options.accelerator_options = ACCELERATOR_OPTIONS
+    # Tables still come out as layout regions; their cell structure is not
+    # used by this script, so TableFormer is skipped. Turning it back on
+    # requires re-enabling both flags
+    pipeline_options.do_table_structure = False
+    pipeline_options.table_structure_options.do_cell_matching = False
     pipeline_options.generate_picture_images = True  # Extract images
-    pipeline_options.images_scale = 2.0  # Image quality (1.0 = original, 2.0 = 2x)
+    # Image quality (1.0 = original, 2.0 = 2x). The saved images are meant for
+    # people, so default to 2x; use --images-scale 1.0 when only the VLM
+    # descriptions matter (the model downsamples its input anyway)
+    pipeline_options.images_scale = images_scale
 
     # Optional: Enable AI-powered image descriptions
     # Requires VLM models - uncomment to enable
@@ -52,7 +95,9 @@ def main():
     converter = DocumentConverter(
         format_options={
             InputFormat.PDF: PdfFormatOption(
-                pipeline_options=pipeline_options
+                pipeline_cls=PDF_PIPELINE,
+                pipeline_options=pipeline_options,
+                backend=PDF_BACKEND
             )
         }
     )
@@ -113,13 +158,10 @@ def main():
             uri_str = str(picture.image.uri)
 
             # If it's a data URI or base64, try to save it
-            if uri_str.startswith('data:'):
+            if uri_str.startswith('data:image/'):
                 try:
-                    import base64
-                    import re
-
                     # Extract base64 data
-                    match = re.match(r'data:image/(\w+);base64,(.+)', uri_str)
+                    match = DATA_URI_RE.match(uri_str)
                     if match:
                         image_format = match.group(1)
                         image_data = base64.b64decode(match.group(2))
@@ -137,57 +179,48 @@ def main():
     # =========================================================================
     print_section("MARKDOWN EXPORT OPTIONS")
 
-    # Option 1: Images as placeholders
-    print("Option 1: Image Placeholders")
-    print("-" * 40)
+    # The four modes only differ in how pictures are rendered, so serialize the
+    # document once (embedded) and derive the other versions by substitution.
+    # Pictures without image data are marked with a sentinel in the base text.
     serializer = MarkdownDocSerializer(
         doc=doc,
         params=MarkdownParams(
-            image_mode=ImageRefMode.PLACEHOLDER,
-            image_placeholder="[IMAGE]",
+            image_mode=ImageRefMode.EMBEDDED,
+            image_placeholder=IMAGE_SENTINEL,
         )
     )
-    md_placeholder = serializer.serialize().text
+    md_base = serializer.serialize().text
+
+    def render_images(replacement):
+        return PICTURE_MARKDOWN_RE.sub(lambda _: replacement, md_base)
+
+    # Option 1: Images as placeholders
+    print("Option 1: Image Placeholders")
+    print("-" * 40)
+    md_placeholder = render_images("[IMAGE]")
     print(md_placeholder[:500])
     print("...\n")
 
     # Option 2: Images as embedded data URIs
     print("Option 2: Embedded Images (data URIs)")
     print("-" * 40)
-    serializer = MarkdownDocSerializer(
-        doc=doc,
-        params=MarkdownParams(
-            image_mode=ImageRefMode.EMBEDDED,
-        )
-    )
-    md_embedded = serializer.serialize().text
+    md_embedded = md_base.replace(IMAGE_SENTINEL, DEFAULT_IMAGE_PLACEHOLDER)
     print(md_embedded[:500])
     print("...\n")
 
     # Option 3: Images as file references
+    # (in-memory pictures have no file path yet, so Docling renders the
+    # default placeholder for them)
     print("Option 3: Referenced Images (local files)")
     print("-" * 40)
-    serializer = MarkdownDocSerializer(
-        doc=doc,
-        params=MarkdownParams(
-            image_mode=ImageRefMode.REFERENCED,
-        )
-    )
-    md_referenced = serializer.serialize().text
+    md_referenced = render_images(DEFAULT_IMAGE_PLACEHOLDER)
     print(md_referenced[:500])
     print("...\n")
 
     # Option 4: Custom placeholder with description
     print("Option 4: Custom Placeholder")
     print("-" * 40)
-    serializer = MarkdownDocSerializer(
-        doc=doc,
-        params=MarkdownParams(
-            image_mode=ImageRefMode.PLACEHOLDER,
-            image_placeholder="<!-- Image: See images folder -->",
-        )
-    )
-    md_custom = serializer.serialize().text
+    md_custom = render_images("<!-- Image: See images folder -->")
     print(md_custom[:500])
     print("...\n")
 
@@ -229,8 +262,8 @@ def main():
         image_metadata.append(metadata)
 
     metadata_file = Path("output/images/metadata.json")
-    with open(metadata_file, "w", encoding="utf-8") as f:
-        json.dump(image_metadata, f, indent=2)
+    with open(metadata_file, "wb", buffering=1 << 20) as f:
+        f.write(orjson.dumps(image_metadata, option=orjson.OPT_INDENT_2 if pretty else None))
     print(f"✓ Image metadata: {metadata_file}")
 
     # =========================================================================
@@ -249,4 +282,11 @@ def main():
     print("="*80)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images-scale", type=float, default=2.0,
+                        help="Render scale for extracted images (default: 2.0)")
+    parser.add_argument("--pretty", action="store_true",
+                        help="Indent metadata.json for reading")
+    args = parser.parse_args()
+
+    main(images_scale=args.images_scale, pretty=args.pretty)